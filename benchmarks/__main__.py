@@ -0,0 +1,455 @@
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from inspect import getfullargspec, signature
+from pathlib import Path
+
+import requests
+from pydantic import TypeAdapter
+
+from uklonapi import AsyncUklonAPI, RetryPolicy, UklonAPI
+from uklonapi.types.account import Auth
+from uklonapi.types.address import FavoriteAddresses
+from uklonapi.types.cities import Cities
+from uklonapi.types.fare_estimate import FareEstimate
+from uklonapi.types.orders_history import Order as HistoryOrder
+
+from .stub import StubServer
+
+ENDPOINTS = {
+    "cities": lambda api: api.cities(),
+    "city_settings": lambda api: api.city_settings(),
+    "me": lambda api: api.me(),
+    "favorite_addresses": lambda api: api.favorite_addresses(),
+    "payment_methods": lambda api: api.payment_methods(),
+    "fare_estimate": lambda api: api.fare_estimate([(50.45, 30.52), (50.4, 30.6)]),
+    "orders": lambda api: api.orders(),
+    "orders_history": lambda api: api.orders_history(page_size=50),
+}
+
+IMPORTS = {
+    "uklonapi": "import uklonapi",
+    "UklonAPI": "from uklonapi import UklonAPI",
+    "AsyncUklonAPI": "from uklonapi import AsyncUklonAPI",
+    "models": "import uklonapi.types.orders, uklonapi.types.orders_history",
+}
+
+# Units of metrics, where more is better for throughput only
+US, RPS, KIB = "us", "calls/s", "KiB"
+
+
+class _Replay:
+    # Records a response of the transport to return it again without the network
+    def __init__(self, transport):
+        self.transport = transport
+        self.response = None
+        self.replay = False
+
+    def get(self, url: str, **kwargs):
+        if not self.replay:
+            self.response = self.transport.get(url, **kwargs)
+        return self.response
+
+    def post(self, url: str, **kwargs):
+        if not self.replay:
+            self.response = self.transport.post(url, **kwargs)
+        return self.response
+
+    def __getattr__(self, name):
+        return getattr(self.transport, name)
+
+
+class _StubSession:
+    # Returns the same response to every request instead of `requests.Session`
+    def __init__(self, content: bytes):
+        self.response = requests.Response()
+        self.response.status_code = 200
+        self.response._content = content
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.response
+
+    post = get
+
+    def close(self):
+        pass
+
+
+def _client(cls: type[UklonAPI], stub: StubServer, **options) -> UklonAPI:
+    api = cls("app-uid", "client-id", "client-secret", 1, **options)
+    api._base_url = stub.base_url
+    return api
+
+
+def _time(f, number: int, repeat: int = 5) -> float:
+    # The best time of a call in microseconds
+    return min(timeit.repeat(f, number=number, repeat=repeat)) / number * 1e6
+
+
+def _import_time(statement: str) -> float:
+    # Microseconds of the imports made by the statement (`-X importtime`),
+    # the top level imports after `site` are the statement ones
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stderr
+    total, started = 0, False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  "):
+            continue  # nested
+        if started and cumulative.strip().isdigit():
+            total += int(cumulative)
+        started = started or name.strip() == "site"
+    return total
+
+
+def bench_import(repeat: int = 5) -> dict:
+    return {
+        f"import.{name}": (min(_import_time(statement) for _ in range(repeat)), US)
+        for name, statement in IMPORTS.items()
+    }
+
+
+def bench_calls(stub: StubServer, number: int) -> dict:
+    # A call against the stub, the call with a replayed response (no network),
+    # and the validation of the response body alone
+    metrics = {}
+    api = _client(UklonAPI, stub)
+    api.account_auth_password("username", "password")
+    replay = api._transport = _Replay(api._transport)
+    for name, call in ENDPOINTS.items():
+        replay.replay = False
+        metrics[f"call.{name}"] = _time(lambda: call(api), number), US
+
+        replay.replay = True
+        content = replay.response.content
+        type_adapter = getattr(UklonAPI, name).endpoint.type_adapter
+        parse = _time(lambda: type_adapter.validate_json(content), number)
+        metrics[f"overhead.{name}"] = _time(lambda: call(api), number) - parse, US
+        metrics[f"parse.{name}"] = parse, US
+    api.close()
+    return metrics
+
+
+def bench_dispatch(stub: StubServer, number: int) -> dict:
+    # A call over a stubbed session with the endpoint metadata precompiled
+    # by the decorator, and with the inspection of the function and
+    # the type adapter made on every call as the decorator did it before
+    api = _client(UklonAPI, stub)
+    api._transport._session = _StubSession(json.dumps(stub.fixtures["cities"]).encode())
+    f = UklonAPI.cities.__wrapped__
+    endpoint = UklonAPI.cities.endpoint
+
+    def per_call():
+        getfullargspec(f)
+        signature(f)
+        response = api.get(endpoint.version, endpoint.path)
+        return TypeAdapter(endpoint.return_type).validate_json(response.text)
+
+    metrics = {
+        "dispatch.precompiled": (_time(api.cities, number), US),
+        "dispatch.per_call": (_time(per_call, number), US),
+    }
+    api.close()
+    return metrics
+
+
+def bench_lookups(stub: StubServer, sizes: tuple[int, ...] = (100, 10_000)) -> dict:
+    # Lookups in the models grown to the sizes from the fixtures. The dict lookups
+    # take the same time for every size and `nearest` (a k-d tree) grows slowly,
+    # unlike the linear scan they replaced
+    metrics = {}
+    locations = random.Random(0)
+    city, address = stub.fixtures["cities"][0], stub.fixtures["favorite_addresses"][0]
+    fare_estimate = stub.fixtures["fare_estimate"]
+    fare = fare_estimate["product_fares"][0]
+    for size in sizes:
+        cities = Cities.model_validate(
+            [
+                {
+                    **city,
+                    "id": i,
+                    "code": f"c{i}",
+                    "location": {
+                        "lat": locations.uniform(44, 52),
+                        "lng": locations.uniform(22, 40),
+                    },
+                }
+                for i in range(size)
+            ]
+        )
+        favorite_addresses = FavoriteAddresses.model_validate(
+            [{**address, "id": f"a{i}"} for i in range(size)]
+        )
+        fares = FareEstimate.model_validate(
+            {
+                **fare_estimate,
+                "product_fares": [
+                    {**fare, "product_type": f"p{i}"} for i in range(size)
+                ],
+            }
+        )
+        # The last items, the worst case of the scan. Indexes are built on first use
+        last = size - 1
+        for lookup, f, number in (
+            ("cities_get", lambda: cities.get(last), 10_000),
+            ("cities_scan", lambda: next(c for c in cities if c.id == last), 100),
+            ("cities_nearest", lambda: cities.nearest((50.45, 30.52)), 1_000),
+            (
+                "favorite_addresses_get",
+                lambda: favorite_addresses.get(f"a{last}"),
+                10_000,
+            ),
+            ("fare", lambda: fares.fare(f"p{last}"), 10_000),
+        ):
+            f()
+            metrics[f"lookup.{lookup}_{size}"] = _time(f, number), US
+    return metrics
+
+
+def bench_throughput(stub: StubServer, number: int, concurrency: int) -> dict:
+    api = _client(UklonAPI, stub)
+    api.account_auth_password("username", "password")
+    with ThreadPoolExecutor(concurrency) as executor:
+        elapsed = timeit.timeit(
+            lambda: list(executor.map(lambda _: api.me(), range(number))), number=1
+        )
+    api.close()
+
+    async def run_async() -> float:
+        async with _client(AsyncUklonAPI, stub) as api:
+            await api.account_auth_password("username", "password")
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def me():
+                async with semaphore:
+                    return await api.me()
+
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await asyncio.gather(*(me() for _ in range(number)))
+            return loop.time() - start
+
+    return {
+        f"throughput.threads_{concurrency}": (number / elapsed, RPS),
+        f"throughput.async_{concurrency}": (number / asyncio.run(run_async()), RPS),
+    }
+
+
+def bench_fare_estimate_many(stub: StubServer, number: int, concurrency: int) -> dict:
+    # A batch of fare estimates one by one and concurrently
+    requests = [
+        {"route": [(50.45, 30.52), (50.4 + i / 1000, 30.6)]} for i in range(number)
+    ]
+    api = _client(UklonAPI, stub)
+    api.account_auth_password("username", "password")
+    serial = timeit.timeit(
+        lambda: [api.fare_estimate(**request) for request in requests], number=1
+    )
+    threads = timeit.timeit(
+        lambda: list(api.fare_estimate_many(requests, concurrency)), number=1
+    )
+    api.close()
+
+    async def run_async() -> float:
+        async with _client(AsyncUklonAPI, stub) as api:
+            await api.account_auth_password("username", "password")
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            results = [r async for r in api.fare_estimate_many(requests, concurrency)]
+            assert not any(isinstance(result, Exception) for result in results)
+            return loop.time() - start
+
+    return {
+        "fare_estimate_many.serial": (number / serial, RPS),
+        f"fare_estimate_many.threads_{concurrency}": (number / threads, RPS),
+        f"fare_estimate_many.async_{concurrency}": (
+            number / asyncio.run(run_async()),
+            RPS,
+        ),
+    }
+
+
+def bench_session(stub: StubServer) -> dict:
+    # The time to the first fare estimate of a new session with expired auth
+    def first_quote(warm_up) -> float:
+        api = _client(UklonAPI, stub)
+        api.city_id = None
+        api.account_auth_password("username", "password")
+        api.auth = Auth.model_validate(
+            {**api.auth.model_dump(), "access_token_exp": int(time.time())}
+        )
+        start = timeit.default_timer()
+        warm_up(api)
+        api.fare_estimate([(50.45, 30.52), (50.4, 30.6)])
+        elapsed = timeit.default_timer() - start
+        api.close()
+        return elapsed * 1e6
+
+    def serial(api: UklonAPI):
+        api.me(update_city=True)
+        api.cities()
+        api.city_settings()
+        api.favorite_addresses()
+        api.payment_methods()
+
+    return {
+        "session.serial": (first_quote(serial), US),
+        "session.bootstrap": (first_quote(UklonAPI.bootstrap), US),
+    }
+
+
+def bench_lean(stub: StubServer, number: int, page_size: int = 500) -> dict:
+    # A replayed page of the orders history parsed with the full models
+    # and with the lean ones: pages per second and the peak memory of a page
+    metrics = {}
+    for name, lean in (
+        ("full", None),
+        ("lean", {HistoryOrder: {"id", "created_at", "status", "cost"}}),
+    ):
+        api = _client(UklonAPI, stub, lean=lean)
+        api.account_auth_password("username", "password")
+        replay = api._transport = _Replay(api._transport)
+        api.orders_history(page_size=page_size)
+        replay.replay = True
+        call = partial(api.orders_history, page_size=page_size)
+        metrics[f"lean.{name}_page_{page_size}"] = 1e6 / _time(call, number), RPS
+        tracemalloc.start()
+        try:
+            call()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        metrics[f"lean.{name}_memory_{page_size}"] = peak / 1024, KIB
+        api.close()
+    return metrics
+
+
+def bench_memory(stub: StubServer) -> dict:
+    # The peak of paging through the whole history
+    api = _client(UklonAPI, stub)
+    api.account_auth_password("username", "password")
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in api.iter_orders_history(page_size=50))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    api.close()
+    assert count == stub.history_total
+    return {"memory.iter_orders_history": (peak / 1024, KIB)}
+
+
+def bench_faults(stub: StubServer, number: int, concurrency: int) -> dict:
+    # Retries of 5xx and re-authorization on 401
+    api = _client(UklonAPI, stub, retry_policy=RetryPolicy(backoff=0.001))
+    api.account_auth_password("username", "password")
+    api.retry_budget.capacity = number
+
+    def me():
+        try:
+            return api.me()
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        start = timeit.default_timer()
+        results = list(executor.map(lambda _: me(), range(number)))
+        elapsed = timeit.default_timer() - start
+    api.close()
+    failed = sum(isinstance(result, Exception) for result in results)
+    return {
+        f"faults.throughput_{concurrency}": (number / elapsed, RPS),
+        "faults.failed": (failed, "calls"),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    metrics = bench_import()
+    with StubServer(history_total=args.history) as stub:
+        metrics.update(bench_dispatch(stub, args.number))
+        metrics.update(bench_lookups(stub))
+        metrics.update(bench_calls(stub, args.number))
+        metrics.update(bench_memory(stub))
+        metrics.update(bench_lean(stub, max(args.number // 10, 1)))
+    with StubServer(latency=args.latency) as stub:
+        metrics.update(bench_throughput(stub, args.calls, args.concurrency))
+        metrics.update(bench_session(stub))
+        metrics.update(bench_fare_estimate_many(stub, args.batch, args.concurrency))
+    with StubServer(
+        latency=args.latency, error_rate=0.05, unauthorized_rate=0.05
+    ) as stub:
+        metrics.update(bench_faults(stub, args.calls, args.concurrency))
+    return metrics
+
+
+def compare(metrics: dict, baseline: dict, threshold: float):
+    print(f"{'metric':<36}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, (value, unit) in metrics.items():
+        if name not in baseline:
+            print(f"{name:<36}{'-':>12}{value:>12.1f} {unit}")
+            continue
+        base = baseline[name][0]
+        change = (value - base) / base * 100 if base else 0
+        # A positive change is a regression
+        if unit == RPS:
+            change = -change
+        mark = "!" if change > threshold else ""
+        print(f"{name:<36}{base:>12.1f}{value:>12.1f}{change:>+9.1f}%{mark} {unit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmarks of the client against a local stub server",
+    )
+    parser.add_argument("--number", type=int, default=100, help="calls per timing")
+    parser.add_argument("--calls", type=int, default=500, help="calls per throughput")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=100, help="fare estimates")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds")
+    parser.add_argument("--history", type=int, default=1000, help="history orders")
+    parser.add_argument("--save", type=Path, help="save the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="compare with a baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=10, help="regression mark, percents"
+    )
+    args = parser.parse_args()
+
+    metrics = run(args)
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        compare(metrics, baseline["metrics"], args.threshold)
+    else:
+        for name, (value, unit) in metrics.items():
+            print(f"{name:<36}{value:>12.1f} {unit}")
+    if args.save:
+        args.save.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "metrics": metrics,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
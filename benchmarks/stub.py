@@ -0,0 +1,236 @@
+import json
+import random
+import sys
+import threading
+import time
+from base64 import urlsafe_b64encode
+from collections import deque
+from copy import deepcopy
+from itertools import count
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _b64(data: dict) -> str:
+    return urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+
+_token_ids = count()
+
+
+def _access_token(expires_in: int) -> str:
+    # An unsigned JWT, the client reads the expiry only
+    header = _b64({"alg": "HS256", "typ": "JWT"})
+    # Unique even if issued within the same second
+    payload = _b64(
+        {"exp": int(time.time()) + expires_in, "sub": "u1", "jti": next(_token_ids)}
+    )
+    return f"{header}.{payload}.c2ln"
+
+
+class LoggedRequest(NamedTuple):
+    path: str
+    status: int
+    authorization: str | None
+    headers: dict[str, str]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body=None, headers: dict = None):
+        self.server.stub.record(self._path, status, dict(self.headers))
+        content = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _handle(self):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        # `/api/v1/cities` -> `cities`
+        path = self._path = url.path.split("/", 3)[-1]
+
+        fault = stub.fault(path, self.headers.get("Authorization"))
+        if stub.latency:
+            time.sleep(stub.latency)
+        if fault:
+            return self._send(fault, {"error": "injected"})
+
+        if path == "account/auth":
+            return self._send(200, stub.auth())
+        if path == "cities":
+            etag = '"cities"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, headers={"ETag": etag})
+            return self._send(200, stub.fixtures["cities"], {"ETag": etag})
+        if path in ("city-settings", "me", "favorite-addresses", "payment-methods"):
+            return self._send(200, stub.fixtures[path.replace("-", "_")])
+        if path == "fare-estimate":
+            fare_estimate = deepcopy(stub.fixtures["fare_estimate"])
+            fare_estimate["fare_id"] = json.loads(body)["fare_id"]
+            return self._send(200, fare_estimate)
+        if path == "orders":
+            return self._send(200, [stub.fixtures["order"]])
+        if path.startswith("orders/"):
+            return self._send(200, {**stub.fixtures["order"], "id": path[7:]})
+        if path == "orders-history":
+            return self._send(200, stub.orders_history(params))
+        self._send(404, {"error": path})
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+    stub: "StubServer"
+
+    def handle_error(self, request, client_address):
+        # Clients timing out close the connection before the response
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    # Serves the recorded fixtures of every endpoint on a local port.
+    # `latency` is added to every response, a share of responses can be replaced
+    # with `error_status` (`error_rate`) or with 401 (`unauthorized_rate`).
+    # Served requests are logged, the next responses of a path can be replaced
+    # with the given statuses (`fail`)
+    def __init__(
+        self,
+        *,
+        latency: float = 0,
+        error_rate: float = 0,
+        error_status: int = 503,
+        unauthorized_rate: float = 0,
+        history_total: int = 1000,
+        fixtures: Path = FIXTURES,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.unauthorized_rate = unauthorized_rate
+        self.history_total = history_total
+        self.fixtures = {
+            path.stem: json.loads(path.read_text()) for path in fixtures.glob("*.json")
+        }
+        self.requests = 0
+        self.faults = 0
+        self.log: list[LoggedRequest] = []
+        self._failures: dict[str, deque[int]] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self) -> "StubServer":
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.stub = self
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def fail(self, path: str, *statuses: int):
+        with self._lock:
+            self._failures.setdefault(path, deque()).extend(statuses)
+
+    def record(self, path: str, status: int, headers: dict[str, str]):
+        with self._lock:
+            self.log.append(
+                LoggedRequest(path, status, headers.get("Authorization"), headers)
+            )
+
+    def served(self, path: str, status: int = None) -> list[LoggedRequest]:
+        with self._lock:
+            return [
+                request
+                for request in self.log
+                if request.path == path
+                if status is None or request.status == status
+            ]
+
+    def fault(self, path: str, authorization: str | None) -> int | None:
+        with self._lock:
+            self.requests += 1
+            status = None
+            if failures := self._failures.get(path):
+                status = failures.popleft()
+            elif path != "account/auth":
+                roll = self._random.random()
+                if roll < self.error_rate:
+                    status = self.error_status
+                elif authorization and roll < self.error_rate + self.unauthorized_rate:
+                    status = 401
+            if status:
+                self.faults += 1
+            return status
+
+    def auth(self) -> dict:
+        auth = dict(self.fixtures["auth"])
+        auth["access_token"] = _access_token(auth["expires_in"])
+        return auth
+
+    def history_item(self, i: int) -> dict:
+        item = deepcopy(self.fixtures["history_item"])
+        item["id"] = f"h{i}"
+        created_at = 1_700_000_000 - i * 3600
+        item["created_at"] = item["pickup_time"] = time.strftime(
+            "%Y-%m-%dT%H:%M:%SZ", time.gmtime(created_at)
+        )
+        return item
+
+    def orders_history(self, params: dict) -> dict:
+        page = int(params.get("page", 1))
+        page_size = int(params.get("page_size", 20))
+        start = (page - 1) * page_size
+        stop = min(start + page_size, self.history_total)
+        orders_history = {
+            "items": [self.history_item(i) for i in range(start, stop)],
+            "has_more_items": stop < self.history_total,
+        }
+        if params.get("include_statistic") in ("True", "true"):
+            canceled = self.history_total // 3
+            orders_history.update(
+                total=self.history_total,
+                completed=self.history_total - canceled,
+                canceled=canceled,
+            )
+        return orders_history
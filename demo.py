@@ -25,16 +25,15 @@ if __name__ == "__main__":
     if auth_success:  # `True` if auth data have been updated
         uklon.auth_save()
 
-    me = uklon.me(update_city=True)  # or just `me = uklon.update_city()`
-
-    cities = uklon.cities()
-    city = cities.get(uklon.city_id or me.city_id)
-    city_settings = uklon.city_settings()
+    # `me`, the city, its settings, favorite addresses and payment methods
+    # fetched concurrently (the city is updated from `me` if it isn't set)
+    context = uklon.bootstrap()
+    me, city, city_settings = context.me, context.city, context.city_settings
+    favorite_addresses = context.favorite_addresses
+    payment_methods = context.payment_methods
 
     orders_history = uklon.orders_history(include_statistic=True)
 
-    favorite_addresses = uklon.favorite_addresses()
-    payment_methods = uklon.payment_methods()
     ride_conditions = city_settings.ride_conditions({RideCondition.NON_SMOKER})
     fare_estimate = uklon.fare_estimate(
         [favorite_addresses.home, favorite_addresses.work],
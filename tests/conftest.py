@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.stub import StubServer
+from uklonapi import AsyncUklonAPI, UklonAPI
+
+
+@pytest.fixture
+def stub():
+    with StubServer(history_total=120) as stub:
+        yield stub
+
+
+@pytest.fixture
+def client(stub):
+    # Creates clients of the stub, the synchronous ones are closed after the test
+    clients = []
+
+    def client(cls: type[UklonAPI] = UklonAPI, city_id: int = 1, **options):
+        api = cls("app-uid", "client-id", "client-secret", city_id, **options)
+        api._base_url = stub.base_url
+        if not isinstance(api, AsyncUklonAPI):
+            clients.append(api)
+        return api
+
+    yield client
+    for api in clients:
+        api.close()
+
+
+@pytest.fixture
+def api(client) -> UklonAPI:
+    api = client()
+    assert api.account_auth_password("username", "password")
+    return api
@@ -0,0 +1,87 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from uklonapi import AsyncUklonAPI
+from uklonapi.types.me import Me
+
+
+def test_account_auth(client, stub):
+    api = client()
+    assert api.account_auth_password("username", "password")
+    assert api.auth is not None
+    assert api.me().uid == "u1"
+    assert stub.served("me")[0].authorization == f"Bearer {api.auth.access_token}"
+
+
+def test_account_auth_async(client, stub):
+    async def main():
+        async with client(AsyncUklonAPI) as api:
+            assert await api.account_auth_password("username", "password")
+            assert api.auth is not None
+            assert (await api.me()).uid == "u1"
+            return api.auth
+
+    auth = asyncio.run(main())
+    assert stub.served("me")[0].authorization == f"Bearer {auth.access_token}"
+
+
+def test_account_auth_failed(client, stub):
+    stub.fail("account/auth", 403)
+    api = client()
+    assert not api.account_auth_password("username", "password")
+    assert api.auth is None
+
+
+def test_me_update_city(client):
+    api = client(city_id=None)
+    api.account_auth_password("username", "password")
+    assert isinstance(api.me(update_city=True), Me)
+    assert api.city_id == 1
+
+
+def test_me_update_city_async(client):
+    async def main():
+        async with client(AsyncUklonAPI, city_id=None) as api:
+            await api.account_auth_password("username", "password")
+            assert isinstance(await api.me(update_city=True), Me)
+            return api.city_id
+
+    assert asyncio.run(main()) == 1
+
+
+def test_orders_path(api, stub):
+    assert api.orders("o1").id == "o1"
+    assert len(api.orders()) == 1
+    assert [request.path for request in stub.served("orders")] == ["orders"]
+
+
+def test_async_close(client):
+    api = client(AsyncUklonAPI)
+    with pytest.raises(TypeError, match="aclose"):
+        api.close()
+    asyncio.run(api.aclose())
+
+
+def test_import_lazy():
+    # The models, pydantic and httpx are imported on the first use
+    code = (
+        "import sys; from uklonapi import UklonAPI; "
+        "print(sorted(m for m in ('httpx', 'pydantic', 'uklonapi.types') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_import_submodules():
+    import uklonapi
+
+    assert uklonapi.types.orders.Order.__name__ == "Order"
+    assert uklonapi.sync.OrdersHistorySync
+    with pytest.raises(AttributeError):
+        uklonapi.missing
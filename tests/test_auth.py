@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from requests import HTTPError
+
+from uklonapi import AsyncUklonAPI
+from uklonapi.types.account import Auth
+
+
+def expiring(auth: Auth, expires_in: float = 0) -> Auth:
+    return Auth.model_validate(
+        {**auth.model_dump(), "access_token_exp": int(time.time() + expires_in)}
+    )
+
+
+def test_refresh_on_unauthorized(api, stub):
+    auth = api.auth
+    stub.fail("me", 401)
+    assert api.me().uid == "u1"
+    assert api.auth is not auth
+    assert [request.status for request in stub.served("me")] == [401, 200]
+    assert len(stub.served("account/auth")) == 2
+
+
+def test_refresh_on_unauthorized_async(client, stub):
+    async def main():
+        async with client(AsyncUklonAPI) as api:
+            await api.account_auth_password("username", "password")
+            stub.fail("me", 401)
+            await api.me()
+
+    asyncio.run(main())
+    assert [request.status for request in stub.served("me")] == [401, 200]
+    assert len(stub.served("account/auth")) == 2
+
+
+def test_refresh_before_expiry(api, stub):
+    api.auth = expiring(api.auth, 30)  # within the skew
+    api.me()
+    assert len(stub.served("account/auth")) == 2
+    assert api.auth.expires_after() > 60
+
+
+def test_refresh_single_flight(api, stub):
+    stub.latency = 0.05
+    api.auth = expiring(api.auth)
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: api.me(), range(8)))
+    assert len(stub.served("account/auth")) == 2
+    assert len(stub.served("me", 200)) == 8
+
+
+def test_refresh_single_flight_async(client, stub):
+    stub.latency = 0.05
+
+    async def main():
+        async with client(AsyncUklonAPI) as api:
+            await api.account_auth_password("username", "password")
+            api.auth = expiring(api.auth)
+            await asyncio.gather(*(api.me() for _ in range(8)))
+
+    asyncio.run(main())
+    assert len(stub.served("account/auth")) == 2
+    assert len(stub.served("me", 200)) == 8
+
+
+def test_refresh_failed(api, stub, caplog):
+    auth = api.auth = expiring(api.auth, 30)
+    stub.fail("account/auth", 503)
+    assert api.me().uid == "u1"
+    # The auth is kept and still sent
+    assert api.auth is auth
+    assert stub.served("me")[0].authorization == f"Bearer {auth.access_token}"
+    assert "Failed to refresh the auth" in caplog.text
+    # And refreshed by the next request
+    api.me()
+    assert api.auth is not auth
+    assert [request.status for request in stub.served("account/auth")] == [
+        200,
+        503,
+        200,
+    ]
+
+
+def test_refresh_failed_connection(api, stub):
+    auth = api.auth = expiring(api.auth, 30)
+    base_url, api._base_url = api._base_url, "http://127.0.0.1:9/api"
+    assert not api._refresh_token()
+    assert api.auth is auth
+    # Refreshed by the next request once the server is reachable
+    api._base_url = base_url
+    api.me()
+    assert api.auth is not auth
+    assert stub.served("me")[0].authorization == f"Bearer {api.auth.access_token}"
+
+
+def test_refresh_failed_unauthorized(api, stub):
+    auth = api.auth
+    stub.fail("me", 401)
+    stub.fail("account/auth", 503)
+    with pytest.raises(HTTPError):
+        api.me()
+    assert api.auth is auth
+    assert api.me().uid == "u1"
+
+
+def test_refresh_failed_async(client, stub):
+    async def main():
+        async with client(AsyncUklonAPI) as api:
+            await api.account_auth_password("username", "password")
+            auth = api.auth = expiring(api.auth, 30)
+            stub.fail("account/auth", 503)
+            await api.me()
+            return auth, api.auth
+
+    auth, kept = asyncio.run(main())
+    assert kept is auth
+    assert stub.served("me")[0].authorization == f"Bearer {auth.access_token}"
+
+
+def test_scheduled_refresh_retried(api, stub, caplog):
+    auth = api.auth = expiring(api.auth, 30)  # due for the scheduled refresh
+    stub.fail("account/auth", 503)
+    api.start_auth_refresh(lead=0, retry_interval=0.05)
+    deadline = time.monotonic() + 5
+    while api.auth.expires_after() < 60 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The failed refresh has kept the auth, so the retry could refresh it
+    assert api.auth is not auth
+    assert api._auth_refresh_timer is not None  # re-armed for the next one
+    api.stop_auth_refresh()
+    assert "Failed to refresh the auth" in caplog.text
+    assert [request.status for request in stub.served("account/auth")] == [
+        200,
+        503,
+        200,
+    ]
+    assert stub.served("account/auth")[-1].authorization is None
+
+
+def test_scheduled_refresh_retried_async(client, stub):
+    async def main():
+        async with client(AsyncUklonAPI) as api:
+            await api.account_auth_password("username", "password")
+            auth = api.auth = expiring(api.auth, 30)
+            stub.fail("account/auth", 503)
+            api.start_auth_refresh(lead=0, retry_interval=0.05)
+            deadline = time.monotonic() + 5
+            while api.auth.expires_after() < 60 and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            assert api.auth is not auth
+            assert not api._auth_refresh_task.done()  # waits for the next one
+
+    asyncio.run(main())
+    assert [request.status for request in stub.served("account/auth")] == [
+        200,
+        503,
+        200,
+    ]
+
+
+def refresh_timers(api) -> list[threading.Timer]:
+    return [
+        thread
+        for thread in threading.enumerate()
+        if isinstance(thread, threading.Timer)
+        and thread.function == api._refresh_auth_scheduled
+        and not thread.finished.is_set()
+    ]
+
+
+@pytest.mark.parametrize("stop", ["stop_auth_refresh", "close"])
+def test_scheduled_refresh_stopped_in_flight(api, stub, stop):
+    stub.latency = 0.3
+    api.auth = expiring(api.auth, 30)
+    api.start_auth_refresh(lead=0)
+    time.sleep(0.1)  # the refresh is in flight
+    getattr(api, stop)()
+    time.sleep(0.4)
+    # The refresh has finished and the scheduler isn't re-armed
+    assert len(stub.served("account/auth")) == 2
+    assert api._auth_refresh_timer is None
+    assert refresh_timers(api) == []
+
+
+def test_scheduled_refresh_restarted_in_flight(api, stub):
+    stub.latency = 0.3
+    api.auth = expiring(api.auth, 30)
+    api.start_auth_refresh(lead=0)
+    time.sleep(0.1)
+    api.start_auth_refresh(lead=0, retry_interval=60)
+    time.sleep(0.8)
+    # Only the restarted scheduler is armed
+    assert refresh_timers(api) == [api._auth_refresh_timer]
+    api.stop_auth_refresh()
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from uklonapi import AsyncUklonAPI, FileAuthStore, MemoryAuthStore
+from uklonapi.types.account import Auth
+
+
+def expiring(auth: Auth, expires_in: float = 0) -> Auth:
+    return Auth.model_validate(
+        {**auth.model_dump(), "access_token_exp": int(time.time() + expires_in)}
+    )
+
+
+@pytest.fixture(params=["file", "memory"])
+def store(request, tmp_path):
+    if request.param == "file":
+        return FileAuthStore(str(tmp_path))
+    return MemoryAuthStore()
+
+
+def test_file_store_atomic(api, tmp_path):
+    store = FileAuthStore(str(tmp_path))
+    store.save("alice", api.auth)
+    # Only the auth file, the temporary one has been replaced
+    assert [path.name for path in tmp_path.iterdir()] == ["alice.json"]
+    assert json.loads(store.path("alice").read_text())["access_token"] == (
+        api.auth.access_token
+    )
+
+
+def test_file_store_reloaded(api, tmp_path):
+    store = FileAuthStore(str(tmp_path))
+    store.save("alice", api.auth)
+    auth = store.load("alice")
+    # Not read again while unchanged
+    assert store.load("alice") is auth
+    # Replaced by another process
+    other = expiring(api.auth, 10)
+    FileAuthStore(str(tmp_path)).save("alice", other)
+    assert store.load("alice").access_token_exp == other.access_token_exp
+    with pytest.raises(KeyError):
+        store.load("bob")
+
+
+def test_store_refreshed_once(client, stub, store):
+    stub.latency = 0.05
+    alice, bob = (client(auth_store=store) for _ in range(2))
+    alice.account_auth_password("username", "password")
+    alice.auth = expiring(alice.auth)
+    assert alice.auth_save()
+    assert bob.auth_load()
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda api: api.me(), [alice, bob] * 4))
+    # The one refreshing client has saved the auth, the other one has reused it
+    assert len(stub.served("account/auth")) == 2
+    assert alice.auth.access_token == bob.auth.access_token
+    assert store.load("app-uid").access_token == alice.auth.access_token
+
+
+def test_store_refreshed_once_async(client, stub, store):
+    stub.latency = 0.05
+
+    async def main():
+        async with (
+            client(AsyncUklonAPI, auth_store=store) as alice,
+            client(AsyncUklonAPI, auth_store=store) as bob,
+        ):
+            await alice.account_auth_password("username", "password")
+            alice.auth = expiring(alice.auth)
+            alice.auth_save()
+            bob.auth_load()
+            await asyncio.gather(*(api.me() for api in [alice, bob] * 4))
+            return alice.auth, bob.auth
+
+    alice, bob = asyncio.run(main())
+    assert len(stub.served("account/auth")) == 2
+    assert alice.access_token == bob.access_token
+
+
+def test_store_no_auth(client, stub, store):
+    alice, bob = client(auth_store=store), client(auth_store=store)
+    assert not alice.auth_save()
+    assert not bob.auth_load()
+    assert bob.auth is None
+    with pytest.raises(KeyError):
+        store.load("app-uid")
+
+
+def test_store_reuse_missing_auth(api, store):
+    # Nothing stored to reuse, the auth is refreshed
+    auth = api.auth = expiring(api.auth)
+    api.auth_store = store
+    api.me()
+    assert api.auth is not auth
+    assert store.load("app-uid") is not None
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+from requests import HTTPError
+
+from uklonapi import AsyncUklonAPI, ResponseCache
+
+PATHS = ("me", "cities", "city-settings", "favorite-addresses", "payment-methods")
+
+
+def test_bootstrap(client, stub):
+    api = client(cache=ResponseCache())
+    api.account_auth_password("username", "password")
+    stub.latency = 0.1
+    start = time.perf_counter()
+    context = api.bootstrap()
+    # Fetched concurrently, not one after another
+    assert time.perf_counter() - start < 0.35
+    assert context.city.id == 1
+    assert context.me.uid == "u1"
+    assert [len(stub.served(path)) for path in PATHS] == [1] * 5
+    # The endpoints with a TTL are cached on the way
+    assert api.cities() is api.cities()
+    assert len(stub.served("cities")) == 1
+
+
+def test_bootstrap_city_from_me(client, stub):
+    api = client(city_id=None)
+    api.account_auth_password("username", "password")
+    context = api.bootstrap()
+    assert api.city_id == context.city.id == 1
+    # The rest are requested for the city taken from `me`
+    (city_settings,) = stub.served("city-settings")
+    assert city_settings.headers["city_id"] == "1"
+
+
+def test_bootstrap_async(client, stub):
+    async def main():
+        async with client(AsyncUklonAPI, city_id=None) as api:
+            await api.account_auth_password("username", "password")
+            stub.latency = 0.1
+            start = time.perf_counter()
+            context = await api.bootstrap()
+            return context, time.perf_counter() - start
+
+    context, elapsed = asyncio.run(main())
+    # `me` first for the city, then the rest concurrently
+    assert elapsed < 0.45
+    assert context.city.id == 1
+    assert [len(stub.served(path)) for path in PATHS] == [1] * 5
+    assert stub.served("city-settings")[0].headers["city_id"] == "1"
+
+
+def test_bootstrap_error(client, stub):
+    api = client()
+    api.account_auth_password("username", "password")
+    stub.fail("payment-methods", 404)
+    with pytest.raises(HTTPError) as e:
+        api.bootstrap()
+    assert e.value.response.status_code == 404
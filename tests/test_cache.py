@@ -0,0 +1,51 @@
+import asyncio
+
+from uklonapi import AsyncUklonAPI, ResponseCache
+
+
+def test_cache(client, stub):
+    api = client(cache=ResponseCache())
+    api.account_auth_password("username", "password")
+    assert api.cities() is api.cities()
+    assert len(stub.served("cities")) == 1
+    assert (api.cache.hits, api.cache.misses) == (1, 1)
+
+    api.cache_invalidate(api.cities)
+    api.cities()
+    assert len(stub.served("cities")) == 2
+
+
+def test_cache_by_city(client, stub):
+    api = client(cache=ResponseCache())
+    api.account_auth_password("username", "password")
+    api.city_settings()
+    api.city_id = 2
+    api.city_settings()
+    assert len(stub.served("city-settings")) == 2
+
+
+def test_cache_async(client, stub):
+    async def main():
+        async with client(AsyncUklonAPI, cache=ResponseCache()) as api:
+            await api.account_auth_password("username", "password")
+            return await api.cities(), await api.cities()
+
+    first, second = asyncio.run(main())
+    assert first is second
+    assert len(stub.served("cities")) == 1
+
+
+def test_cache_by_account(client, stub):
+    # Accounts sharing a device (`app_uid`) don't share results
+    cache = ResponseCache()
+    alice = client(cache=cache, auth_key="alice")
+    bob = client(cache=cache, auth_key="bob")
+    for api in (alice, bob):
+        api.account_auth_password("username", "password")
+        api.payment_methods()
+    assert len(stub.served("payment-methods")) == 2
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    alice.cache_invalidate(alice.payment_methods)
+    bob.payment_methods()
+    assert len(stub.served("payment-methods")) == 2
@@ -0,0 +1,49 @@
+import csv
+
+import pytest
+
+from uklonapi import export
+from uklonapi.export import export_orders_history
+
+
+def read_ids(path) -> list[str]:
+    with path.open(newline="", encoding="utf-8") as file:
+        return [row["id"] for row in csv.DictReader(file)]
+
+
+def test_export_csv(api, tmp_path):
+    path = tmp_path / "orders.csv"
+    assert export_orders_history(api, str(path), page_size=10, batch_pages=2) == 120
+    assert read_ids(path) == [f"h{i}" for i in range(120)]
+    assert not path.with_name("orders.csv.checkpoint").exists()
+
+
+def test_export_parquet(api, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "orders"
+    export_orders_history(api, str(path), "parquet", page_size=10, batch_pages=5)
+    assert pq.read_table(path).column("id").to_pylist() == [f"h{i}" for i in range(120)]
+
+
+def test_export_csv_resumed(api, tmp_path, monkeypatch):
+    # Interrupted after the rows of the third batch are written,
+    # but before its checkpoint
+    path = tmp_path / "orders.csv"
+    write_atomic = export.write_atomic
+    checkpoints = 0
+
+    def interrupted(*args):
+        nonlocal checkpoints
+        checkpoints += 1
+        if checkpoints == 3:
+            raise KeyboardInterrupt
+        write_atomic(*args)
+
+    monkeypatch.setattr(export, "write_atomic", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        export_orders_history(api, str(path), page_size=10, batch_pages=2)
+    assert len(read_ids(path)) == 60
+
+    monkeypatch.setattr(export, "write_atomic", write_atomic)
+    assert export_orders_history(api, str(path), page_size=10, batch_pages=2) == 80
+    assert read_ids(path) == [f"h{i}" for i in range(120)]
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from uklonapi import FareCache
+
+ROUTE = [(50.45001, 30.52001), (50.40001, 30.60001)]
+
+
+@pytest.fixture
+def api(client):
+    api = client(fare_cache=FareCache(time_bucket=300))
+    api.account_auth_password("username", "password")
+    return api
+
+
+def test_fare_cache_rounded(api, stub):
+    # Points within the precision share the estimate
+    api.fare_estimate(ROUTE)
+    api.fare_estimate([(50.450012, 30.520014), (50.400008, 30.600009)])
+    assert len(stub.served("fare-estimate")) == 1
+    api.fare_estimate([(50.4510, 30.5200), (50.4000, 30.6000)])
+    assert len(stub.served("fare-estimate")) == 2
+    assert (api.fare_cache.hits, api.fare_cache.misses) == (1, 2)
+
+
+def test_fare_cache_time_bucket(api, stub):
+    bucket = 1_700_000_100 // 300 * 300
+    for timestamp in (bucket, bucket + 299, bucket + 300):
+        pickup_time = datetime.fromtimestamp(timestamp, timezone.utc)
+        api.fare_estimate(ROUTE, pickup_time=pickup_time)
+    assert len(stub.served("fare-estimate")) == 2
+
+
+def test_fare_cache_fare_id(api, stub):
+    # A particular estimate is always requested
+    fare_id = uuid4()
+    first = api.fare_estimate(ROUTE, fare_id=fare_id)
+    second = api.fare_estimate(ROUTE, fare_id=fare_id)
+    assert len(stub.served("fare-estimate")) == 2
+    assert first.fare_id == second.fare_id == fare_id
+
+
+def test_fare_cache_copy(api, stub):
+    first = api.fare_estimate(ROUTE)
+    first.fare_id = uuid4()
+    second, third = api.fare_estimate(ROUTE), api.fare_estimate(ROUTE)
+    assert second is not third
+    assert second == third
+    assert second.fare_id != first.fare_id
+    assert len(stub.served("fare-estimate")) == 1
@@ -0,0 +1,40 @@
+from uklonapi import MetricsCollector, RetryPolicy, prometheus_text
+
+ME = (("path", "me"), ("version", "v1"))
+
+
+def test_metrics(client, stub):
+    metrics = MetricsCollector()
+    api = client(instrumentation=metrics, retry_policy=RetryPolicy(backoff=0.001))
+    api.account_auth_password("username", "password")
+    stub.fail("me", 503)
+    api.me()
+    assert metrics.requests[(*ME, ("status", "503"))] == 1
+    assert metrics.requests[(*ME, ("status", "200"))] == 1
+    assert metrics.retries[ME] == 1
+    assert metrics.request_duration[ME].count == 2
+    # Only the successful response is validated
+    assert metrics.validate_duration[ME].count == 1
+    assert metrics.bytes_in[ME] > 0
+
+
+def test_prometheus_text(client, stub):
+    metrics = MetricsCollector(buckets=(0.5, 1))
+    api = client(instrumentation=metrics)
+    api.account_auth_password("username", "password")
+    api.me()
+    api.me()
+    lines = prometheus_text(metrics).splitlines()
+    assert "# TYPE uklon_request_duration_seconds histogram" in lines
+    assert (
+        'uklon_request_duration_seconds_bucket{path="me",version="v1",le="+Inf"} 2'
+        in lines
+    )
+    assert 'uklon_request_duration_seconds_count{path="me",version="v1"} 2' in lines
+    assert 'uklon_requests_total{path="me",version="v1",status="200"} 2' in lines
+    assert (
+        'uklon_requests_total{path="account/auth",version="v1",status="200"} 1' in lines
+    )
+
+    metrics.clear()
+    assert "uklon_requests_total{" not in prometheus_text(metrics)
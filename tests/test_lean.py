@@ -0,0 +1,36 @@
+from uklonapi import Unset
+from uklonapi.types.fare_estimate import Fare, FareEstimate
+from uklonapi.types.orders_history import Order, OrdersHistory
+from uklonapi.types.payment_methods import PaymentMethod, PaymentMethods
+
+
+def test_lean_fare_estimate(client):
+    api = client(lean={Fare: {"product_type", "low"}})
+    api.account_auth_password("username", "password")
+    fare_estimate = api.fare_estimate([(50.45, 30.52), (50.4, 30.6)])
+    assert isinstance(fare_estimate, FareEstimate)
+    assert isinstance(fare_estimate.standard, Fare)
+    assert fare_estimate.standard.low == 100
+    assert fare_estimate.fare("Comfort").high is Unset
+
+
+def test_lean_payment_methods(client):
+    api = client(lean={PaymentMethod: {"id", "payment_type"}})
+    api.account_auth_password("username", "password")
+    payment_methods = api.payment_methods()
+    assert isinstance(payment_methods, PaymentMethods)
+    payment_method = payment_methods.default_payment_method
+    assert isinstance(payment_method, PaymentMethod)
+    assert payment_method.for_fare() == {"id": "cash", "type": "cash"}
+
+
+def test_lean_orders_history(client):
+    api = client(lean={Order: {"id", "created_at"}})
+    api.account_auth_password("username", "password")
+    orders_history = api.orders_history(page_size=5)
+    assert isinstance(orders_history, OrdersHistory)
+    order = orders_history.items[0]
+    assert isinstance(order, Order)
+    assert order.id == "h0"
+    assert order.status is Unset
+    assert order.route is Unset
@@ -0,0 +1,38 @@
+import asyncio
+from datetime import datetime, timezone
+
+from uklonapi import AsyncUklonAPI
+
+
+def test_iter_orders_history(api, stub):
+    orders = list(api.iter_orders_history(page_size=50, prefetch=2))
+    assert [order.id for order in orders] == [f"h{i}" for i in range(120)]
+    # 3 pages and up to 2 prefetched past the last one
+    assert 3 <= len(stub.served("orders-history")) <= 5
+
+
+def test_iter_orders_history_async(client, stub):
+    async def main():
+        async with client(AsyncUklonAPI) as api:
+            await api.account_auth_password("username", "password")
+            return [order async for order in api.iter_orders_history(page_size=50)]
+
+    orders = asyncio.run(main())
+    assert [order.id for order in orders] == [f"h{i}" for i in range(120)]
+
+
+def test_iter_orders_history_since(api, stub):
+    # Orders are an hour apart, newest first
+    since = stub.history_item(14)["created_at"]
+    since = datetime.strptime(since, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    orders = list(api.iter_orders_history(page_size=10, prefetch=1, since=since))
+    assert [order.id for order in orders] == [f"h{i}" for i in range(15)]
+    # The second page has the cut-off, at most one more page has been prefetched
+    assert len(stub.served("orders-history")) <= 3
+
+
+def test_iter_orders_history_closed(api, stub):
+    orders = api.iter_orders_history(page_size=10, prefetch=3)
+    next(orders)
+    orders.close()
+    assert len(stub.served("orders-history")) <= 4
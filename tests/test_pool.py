@@ -0,0 +1,23 @@
+from uklonapi import ResponseCache, UklonClientPool
+
+
+def test_pool_accounts_share_app_uid(stub, tmp_path):
+    pool = UklonClientPool(
+        "client-id", "client-secret", auth_dir=str(tmp_path), cache=ResponseCache()
+    )
+    try:
+        for account in ("alice", "bob"):
+            client = pool.add_account(account, "device-1", 1)
+            client._base_url = stub.base_url
+            assert client.account_auth_password(account, "password")
+        alice, bob = pool.for_account("alice"), pool.for_account("bob")
+        assert alice.payment_methods() is not bob.payment_methods()
+        assert len(stub.served("payment-methods")) == 2
+        # Every account has its own auth in the store
+        assert pool.auth_save() == {"alice": True, "bob": True}
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "alice.json",
+            "bob.json",
+        ]
+    finally:
+        pool.close()
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from requests import HTTPError
+
+from uklonapi import AsyncUklonAPI, RetryPolicy
+
+POLICY = RetryPolicy(backoff=0.001)
+
+
+def test_retry(client, stub):
+    api = client(retry_policy=POLICY)
+    api.account_auth_password("username", "password")
+    stub.fail("me", 503, 502)
+    assert api.me().uid == "u1"
+    assert [request.status for request in stub.served("me")] == [503, 502, 200]
+    assert api.retry_stats.retries["me"] == 2
+
+
+def test_retry_async(client, stub):
+    async def main():
+        async with client(AsyncUklonAPI, retry_policy=POLICY) as api:
+            await api.account_auth_password("username", "password")
+            stub.fail("me", 503)
+            await api.me()
+            return api.retry_stats.retries["me"]
+
+    assert asyncio.run(main()) == 1
+    assert [request.status for request in stub.served("me")] == [503, 200]
+
+
+def test_retry_exhausted(client, stub):
+    api = client(retry_policy=POLICY)
+    api.account_auth_password("username", "password")
+    stub.fail("me", 503, 503, 503)
+    with pytest.raises(HTTPError):
+        api.me()
+    assert api.retry_stats.exhausted["me"] == 1
+
+
+def test_not_retryable_status(client, stub):
+    api = client(retry_policy=POLICY)
+    api.account_auth_password("username", "password")
+    stub.fail("me", 404)
+    with pytest.raises(HTTPError):
+        api.me()
+    assert len(stub.served("me")) == 1
@@ -0,0 +1,40 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from uklonapi import AsyncUklonAPI, SingleFlight
+
+
+def test_coalesced(client, stub):
+    stub.latency = 0.1
+    api = client(single_flight=SingleFlight())
+    api.account_auth_password("username", "password")
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda _: api.city_settings(), range(8)))
+    assert len(stub.served("city-settings")) == 1
+    assert api.single_flight.coalesced == 7
+    assert all(result is results[0] for result in results)
+
+
+def test_coalesced_async(client, stub):
+    stub.latency = 0.1
+
+    async def main():
+        async with client(AsyncUklonAPI, single_flight=SingleFlight()) as api:
+            await api.account_auth_password("username", "password")
+            await asyncio.gather(*(api.city_settings() for _ in range(8)))
+            return api.single_flight.coalesced
+
+    assert asyncio.run(main()) == 7
+    assert len(stub.served("city-settings")) == 1
+
+
+def test_different_calls_not_coalesced(client, stub):
+    stub.latency = 0.05
+    api = client(single_flight=SingleFlight())
+    api.account_auth_password("username", "password")
+    with ThreadPoolExecutor(2) as executor:
+        executor.submit(api.orders, "o1")
+        executor.submit(api.orders, "o2")
+    assert len(stub.served("orders/o1")) == 1
+    assert len(stub.served("orders/o2")) == 1
+    assert api.single_flight.coalesced == 0
@@ -0,0 +1,42 @@
+import asyncio
+
+from uklonapi import AsyncUklonAPI, SQLiteResponseStore
+
+
+def test_store_revalidation(client, stub, tmp_path):
+    store = SQLiteResponseStore(str(tmp_path / "responses.sqlite3"))
+    api = client(store=store)
+    api.account_auth_password("username", "password")
+    cities = api.cities()
+    assert api.cities() == cities
+    first, second = stub.served("cities")
+    assert "If-None-Match" not in first.headers
+    assert second.headers["If-None-Match"] == '"cities"'
+    assert second.status == 304
+    store.close()
+
+
+def test_store_revalidation_async(client, stub, tmp_path):
+    store = SQLiteResponseStore(str(tmp_path / "responses.sqlite3"))
+
+    async def main():
+        async with client(AsyncUklonAPI, store=store) as api:
+            await api.account_auth_password("username", "password")
+            return await api.cities(), await api.cities()
+
+    first, second = asyncio.run(main())
+    assert first == second
+    assert [request.status for request in stub.served("cities")] == [200, 304]
+    store.close()
+
+
+def test_store_by_account(client, stub, tmp_path):
+    # A body stored for one account is never revalidated by another one
+    store = SQLiteResponseStore(str(tmp_path / "responses.sqlite3"))
+    for auth_key in ("alice", "bob"):
+        api = client(store=store, auth_key=auth_key)
+        api.account_auth_password("username", "password")
+        api.cities()
+    assert [request.status for request in stub.served("cities")] == [200, 200]
+    assert "If-None-Match" not in stub.served("cities")[1].headers
+    store.close()
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+import pytest
+
+from uklonapi.sync import OrdersHistorySync
+
+
+@pytest.fixture
+def sync(api, tmp_path):
+    sync = OrdersHistorySync(
+        api, str(tmp_path / "history.sqlite3"), page_size=50, prefetch=0
+    )
+    yield sync
+    sync.close()
+
+
+def test_sync(sync, stub):
+    assert sync.run() == (3, 120, 0)
+    stats = sync.stats()
+    assert (stats.total, stats.completed, stats.canceled) == (120, 0, 120)
+    orders = list(sync.orders())
+    assert [order.id for order in orders] == [f"h{i}" for i in range(120)]
+    assert [order.id for order in sync.orders(since=orders[4].created_at)] == [
+        f"h{i}" for i in range(5)
+    ]
+
+
+def test_sync_overlap(sync, stub):
+    sync.run()
+    # Orders are an hour apart, the first page reaches the overlap
+    sync.overlap = timedelta(hours=10)
+    stub.fixtures["history_item"]["status"] = "completed"
+    assert sync.run() == (1, 0, 50)
+    stats = sync.stats()
+    assert (stats.total, stats.completed, stats.canceled) == (120, 50, 70)
+    assert len(stub.served("orders-history")) == 4
+
+
+def test_sync_resumed(sync, api, stub, monkeypatch):
+    orders_history = api.orders_history
+
+    def interrupted(**kwargs):
+        if kwargs["page"] == 2:
+            raise ConnectionError
+        return orders_history(**kwargs)
+
+    monkeypatch.setattr(api, "orders_history", interrupted)
+    with pytest.raises(ConnectionError):
+        sync.run()
+    assert sync.stats().total == 50
+
+    monkeypatch.undo()
+    # Continued from the second page
+    assert sync.run() == (2, 70, 0)
+    assert sync.stats().total == 120
+    assert len(stub.served("orders-history")) == 3
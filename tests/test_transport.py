@@ -0,0 +1,51 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+
+from uklonapi import (
+    AsyncUklonAPI,
+    HTTPXTransport,
+    RequestsTransport,
+    TransportConfig,
+)
+
+SLOW = TransportConfig(read_timeout=0.05)
+
+
+@pytest.mark.parametrize(
+    "transport, error",
+    [(RequestsTransport, requests.Timeout), (HTTPXTransport, httpx.ReadTimeout)],
+)
+def test_read_timeout(client, stub, transport, error):
+    api = client(transport=transport(SLOW), retry_policy=None)
+    assert api.account_auth_password("username", "password")
+    stub.latency = 0.3
+    with pytest.raises(error):
+        api.me()
+    api._transport.close()
+
+
+def test_read_timeout_async(client, stub):
+    async def main():
+        async with client(
+            AsyncUklonAPI, transport_config=SLOW, retry_policy=None
+        ) as api:
+            await api.account_auth_password("username", "password")
+            stub.latency = 0.3
+            await api.me()
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(main())
+
+
+def test_httpx_timeouts():
+    config = TransportConfig(
+        connect_timeout=1, read_timeout=2, write_timeout=3, pool_timeout=4
+    )
+    transport = HTTPXTransport(config)
+    assert transport._client.timeout == httpx.Timeout(
+        connect=1, read=2, write=3, pool=4
+    )
+    transport.close()
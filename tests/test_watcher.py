@@ -0,0 +1,53 @@
+import asyncio
+
+from uklonapi import AsyncUklonAPI, OrderWatcher
+
+
+def test_watcher_changes(api, stub):
+    watcher = OrderWatcher(api, ["o1"])
+    (event,) = watcher.poll()
+    assert event.order_id == "o1"
+    assert event.changes["status"] == (None, "processing")
+    assert watcher.interval() == 2
+    # Nothing has changed
+    assert watcher.poll() == []
+
+    stub.fixtures["order"]["status"] = "running"
+    (event,) = watcher.poll()
+    assert event.changes == {"status": ("processing", "running")}
+    assert not event.final
+    assert watcher.interval() == 10
+
+    stub.fixtures["order"]["status"] = "completed"
+    (event,) = watcher.poll()
+    assert event.final
+    assert len(watcher) == 0
+    # All the orders are polled with one request
+    assert len(stub.served("orders")) == 4
+
+
+def test_watcher_inactive_order(api, stub):
+    # An order missing from the active ones is requested for its final state
+    watcher = OrderWatcher(api, ["o2"])
+    (event,) = watcher.poll()
+    assert event.order_id == "o2"
+    assert len(stub.served("orders/o2")) == 1
+
+
+def test_watcher_async(client, stub):
+    async def main():
+        async with client(AsyncUklonAPI) as api:
+            await api.account_auth_password("username", "password")
+            watcher = OrderWatcher(api, watch_new=True, intervals={"processing": 0})
+            events = []
+            async for event in watcher:
+                events.append(event)
+                stub.fixtures["order"]["status"] = "completed"
+                if event.final:
+                    break
+            return events
+
+    first, last = asyncio.run(main())
+    assert first.changes["status"] == (None, "processing")
+    assert last.final
+    assert last.changes["status"] == ("processing", "completed")
@@ -1,3 +1,81 @@
-from .api import UklonAPI
-from .types import Unset
-from .types.fare_estimate import Point, RideCondition
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Exported names and their modules, which are imported on the first access only
+_exports = {
+    "UklonAPI": ".api",
+    "SessionContext": ".api",
+    "AsyncUklonAPI": ".async_api",
+    "FileAuthStore": ".auth_store",
+    "MemoryAuthStore": ".auth_store",
+    "FareCache": ".cache",
+    "ResponseCache": ".cache",
+    "SQLiteResponseStore": ".cache",
+    "Instrumentation": ".instrumentation",
+    "Instrumentations": ".instrumentation",
+    "MetricsCollector": ".instrumentation",
+    "SpanRecorder": ".instrumentation",
+    "prometheus_text": ".instrumentation",
+    "UklonClientPool": ".pool",
+    "RateLimiter": ".rate_limit",
+    "RetryBudget": ".retry",
+    "RetryPolicy": ".retry",
+    "SingleFlight": ".single_flight",
+    "AsyncHTTPXTransport": ".transport",
+    "HTTPXTransport": ".transport",
+    "RequestsTransport": ".transport",
+    "TransportConfig": ".transport",
+    "Unset": ".types",
+    "Point": ".types.fare_estimate",
+    "RideCondition": ".types.fare_estimate",
+    "OrderEvent": ".watcher",
+    "OrderWatcher": ".watcher",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str):
+    if name in _exports:
+        value = getattr(import_module(_exports[name], __name__), name)
+        globals()[name] = value
+        return value
+    # Submodules are imported on the first access too, `uklonapi.types` for example
+    if not name.startswith("_"):
+        try:
+            return import_module(f".{name}", __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
+
+
+if TYPE_CHECKING:
+    from .api import SessionContext, UklonAPI
+    from .async_api import AsyncUklonAPI
+    from .auth_store import FileAuthStore, MemoryAuthStore
+    from .cache import FareCache, ResponseCache, SQLiteResponseStore
+    from .instrumentation import (
+        Instrumentation,
+        Instrumentations,
+        MetricsCollector,
+        SpanRecorder,
+        prometheus_text,
+    )
+    from .pool import UklonClientPool
+    from .rate_limit import RateLimiter
+    from .retry import RetryBudget, RetryPolicy
+    from .single_flight import SingleFlight
+    from .transport import (
+        AsyncHTTPXTransport,
+        HTTPXTransport,
+        RequestsTransport,
+        TransportConfig,
+    )
+    from .types import Unset
+    from .types.fare_estimate import Point, RideCondition
+    from .watcher import OrderEvent, OrderWatcher
@@ -1,26 +1,100 @@
+from __future__ import annotations
+
+import logging
 import time
-from contextlib import suppress
+from collections import ChainMap, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import closing, suppress
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import StrEnum, auto
-from functools import wraps
-from inspect import getfullargspec, isfunction, isgeneratorfunction, signature
+from functools import cached_property, partial, wraps
+from importlib import import_module
+from inspect import (
+    getfullargspec,
+    iscoroutinefunction,
+    isfunction,
+    isgeneratorfunction,
+    signature,
+)
+from itertools import count
+from json import dumps
 from pathlib import Path
-from types import FunctionType
-from typing import Union, cast, get_overloads, overload
+from threading import Lock, RLock, Timer, current_thread
+from types import FunctionType, MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    Union,
+    cast,
+    get_overloads,
+    overload,
+)
 from uuid import UUID, uuid4
 
-from pydantic import TypeAdapter
-from requests import Response, Session
+from requests import Response
+
+from .auth_store import AuthStore, write_atomic
+from .cache import CacheKey, FareCache, ResponseCache, ResponseStore, StoredResponse
+from .instrumentation import Instrumentation, RequestRecord, request_size
+from .rate_limit import RateLimiter
+from .retry import RetryBudget, RetryPolicy, RetryStats, retryable_errors
+from .single_flight import SingleFlight
+from .transport import RequestsTransport, Transport, TransportConfig, http_errors
+
+# The models (and pydantic) are imported on the first use of an endpoint,
+# the annotations are strings resolved by `_Endpoint.return_type`
+if TYPE_CHECKING:
+    from pydantic import BaseModel, TypeAdapter
+
+    from .lean import LeanFields
+    from .types.account import Auth
+    from .types.address import Address, FavoriteAddresses
+    from .types.cities import Cities, City
+    from .types.city_settings import CitySettings
+    from .types.fare_estimate import (
+        FareEstimate,
+        Point,
+        RideCondition,
+        SelectedOptions,
+    )
+    from .types.me import Me
+    from .types.orders import Order
+    from .types.orders_history import Order as HistoryOrder
+    from .types.orders_history import OrdersHistory, OrdersHistoryStats
+    from .types.payment_methods import PaymentMethod, PaymentMethods
+
+logger = logging.getLogger(__name__)
+
 
-from .types.account import Auth
-from .types.address import Address, FavoriteAddresses
-from .types.cities import Cities
-from .types.city_settings import CitySettings
-from .types.fare_estimate import FareEstimate, Point, RideCondition, SelectedOptions
-from .types.me import Me
-from .types.orders import Order
-from .types.orders_history import OrdersHistory, OrdersHistoryStats
-from .types.payment_methods import PaymentMethod, PaymentMethods
+class _Models(dict):
+    # Models of the return annotations mapped to their modules, imported on lookup
+    _modules = {
+        "Auth": ".types.account",
+        "Cities": ".types.cities",
+        "CitySettings": ".types.city_settings",
+        "FavoriteAddresses": ".types.address",
+        "FareEstimate": ".types.fare_estimate",
+        "Me": ".types.me",
+        "Order": ".types.orders",
+        "OrdersHistory": ".types.orders_history",
+        "OrdersHistoryStats": ".types.orders_history",
+        "PaymentMethods": ".types.payment_methods",
+    }
+
+    def __missing__(self, name: str):
+        module = import_module(self._modules[name], __package__)
+        self[name] = model = getattr(module, name)
+        return model
+
+
+_models = _Models()
 
 
 class APIMethod(StrEnum):
@@ -38,19 +112,42 @@ class AuthGrantType(StrEnum):
     REFRESH_TOKEN = auto()
 
 
-def _uklon_api_wrapper(
-    f: FunctionType, method: APIMethod, version: APIVersion, json: bool
-):
-    # Get a request path from the function name
-    # `_` at the beginning is ignored, `__` is for `/` and `_` is for `-`
-    path = f.__name__.lstrip("_").replace("__", "/").replace("_", "-")
+@dataclass(frozen=True)
+class _Endpoint:
+    path: str
+    method: APIMethod
+    version: APIVersion
+    kw_key: str
+    defaults: Mapping[str, Any]
+    path_params: tuple[int, ...]
+    generator: bool
+    # Return annotations (of the overloads too), strings are resolved on the first call
+    return_annotations: tuple[Any, ...]
+    namespace: Mapping[str, Any] = field(repr=False, compare=False)
+    ttl: float | None
+    cache: str
+    retry: bool | RetryPolicy
+    authorized: bool
 
-    @wraps(f)
-    def wrapper(self: "UklonAPI", *args, **kwargs):
-        nonlocal path
+    @classmethod
+    def from_function(
+        cls,
+        f: FunctionType,
+        method: APIMethod,
+        version: APIVersion,
+        *,
+        json: bool,
+        ttl: float | None,
+        cache: str,
+        retry: bool | RetryPolicy,
+        authorized: bool,
+    ) -> _Endpoint:
+        # Get a request path from the function name
+        # `_` at the beginning is ignored, `__` is for `/` and `_` is for `-`
+        path = f.__name__.lstrip("_").replace("__", "/").replace("_", "-")
 
         spec = getfullargspec(f)
-        default_kwargs = {
+        defaults = {
             k: v
             for k, v in dict(
                 (
@@ -62,28 +159,14 @@ def _uklon_api_wrapper(
             ).items()
             if v is not None
         }
-        call_kwargs = {**default_kwargs, **kwargs}
 
-        generator = (
-            f(self, *args, **call_kwargs)
-            if isgeneratorfunction(f)
-            else (x(self, *args, **call_kwargs) for x in (f,))
-        )
-
-        # The first generator execution (or the first function call).
-        # Expecting the updated kwargs for request is yielded/returned or None
-        call_kwargs = next(generator, None) or call_kwargs
-
-        sign = signature(f)
-        positionals = {k: v for k, v in zip(reversed(spec.args), reversed(args))}
-        path_args = tuple(
-            arg
-            for param in sign.parameters.values()
+        # Positional-only parameters (except `self`) are a part of the request path
+        parameters = tuple(signature(f).parameters.values())[1:]
+        path_params = tuple(
+            i
+            for i, param in enumerate(parameters)
             if param.kind is param.POSITIONAL_ONLY
-            if (arg := positionals.get(param.name)) is not None
         )
-        if path_args:
-            path = (path, *path_args)
 
         if method == APIMethod.GET:
             kw_key = "params"
@@ -91,30 +174,376 @@ def _uklon_api_wrapper(
             kw_key = "json"
         else:
             kw_key = "data"
-        kw = {kw_key: call_kwargs} if call_kwargs else {}
-        response: Response = getattr(self, method)(version, path, **kw)
 
-        return_type = f.__annotations__.get("return")
-        if not return_type:
+        return_annotation = f.__annotations__.get("return")
+        if return_annotation:
+            return_annotations = (return_annotation,)
+        else:
             overloads = cast(list[FunctionType], get_overloads(f))
-            if overloads:
-                return_type = Union[
-                    *filter(
-                        None, (ol.__annotations__.get("return") for ol in overloads)
-                    )
-                ]
-        result = (
-            TypeAdapter(return_type).validate_json(response.text)
-            if return_type
-            else None
+            return_annotations = tuple(
+                filter(None, (ol.__annotations__.get("return") for ol in overloads))
+            )
+
+        return cls(
+            path=path,
+            method=method,
+            version=version,
+            kw_key=kw_key,
+            defaults=MappingProxyType(defaults),
+            path_params=path_params,
+            generator=isgeneratorfunction(f),
+            return_annotations=return_annotations,
+            namespace=f.__globals__,
+            ttl=ttl,
+            cache=cache,
+            retry=retry,
+            authorized=authorized,
+        )
+
+    def request_path(self, args: tuple) -> str | tuple[str, ...]:
+        path_args = tuple(
+            arg
+            for i in self.path_params
+            if i < len(args)
+            if (arg := args[i]) is not None
+        )
+        return (self.path, *path_args) if path_args else self.path
+
+    def request_kwargs(self, call_kwargs: dict) -> dict:
+        request_kwargs = {self.kw_key: call_kwargs} if call_kwargs else {}
+        if not self.authorized:
+            request_kwargs["authorized"] = False
+        return request_kwargs
+
+    @cached_property
+    def return_type(self) -> Any:
+        # Names of the function's module first, then the models imported on lookup
+        namespace = ChainMap(self.namespace, _models)
+        return_types = [
+            (
+                eval(annotation, self.namespace, namespace)
+                if isinstance(annotation, str)
+                else annotation
+            )
+            for annotation in self.return_annotations
+        ]
+        if len(return_types) > 1:
+            return Union[*return_types]
+        return return_types[0] if return_types else None
+
+    # Built on the first call, the schemas of the models are deferred too
+    @cached_property
+    def type_adapter(self) -> TypeAdapter | None:
+        from pydantic import TypeAdapter
+
+        return TypeAdapter(self.return_type) if self.return_type else None
+
+    def validate(self, response: Response, lean: LeanFields = None):
+        if self.type_adapter is None:
+            return None
+        if lean:
+            from .lean import lean_type_adapter
+
+            type_adapter = lean_type_adapter(self.return_type, lean)
+        else:
+            type_adapter = self.type_adapter
+        # Validated straight from the bytes, the body isn't decoded to a string
+        return type_adapter.validate_json(response.content)
+
+
+def _send(generator: Generator, result):
+    with suppress(StopIteration):
+        # A yield receives a Pydantic object to store/process it internally, for example
+        generator.send(result)
+
+    return result
+
+
+def _retry_delay(
+    self: "UklonAPI",
+    endpoint: _Endpoint,
+    policy: RetryPolicy,
+    error: Exception,
+    attempt: int,
+) -> float | None:
+    # Seconds to wait before the next attempt or `None` to give up
+    if not policy.retryable(error):
+        return None
+    if attempt + 1 >= policy.max_attempts:
+        self.retry_stats.record(self.retry_stats.exhausted, endpoint.path)
+        return None
+    if not self.retry_budget.withdraw():
+        self.retry_stats.record(self.retry_stats.budget_exhausted, endpoint.path)
+        return None
+    self.retry_stats.record(self.retry_stats.retries, endpoint.path)
+    return policy.delay(error, attempt)
+
+
+def _request_record(
+    endpoint: _Endpoint,
+    attempt: int,
+    start: float,
+    duration: float,
+    response: Response | None,
+    error: Exception | None,
+) -> RequestRecord:
+    return RequestRecord(
+        path=endpoint.path,
+        version=endpoint.version,
+        method=endpoint.method,
+        attempt=attempt,
+        start=start,
+        duration=duration,
+        status=response.status_code if response is not None else None,
+        bytes_in=len(response.content) if response is not None else 0,
+        bytes_out=request_size(response) if response is not None else 0,
+        error=error,
+    )
+
+
+def _send_instrumented(
+    instrumentation: Instrumentation,
+    endpoint: _Endpoint,
+    attempt: int,
+    send: Callable[[], Response],
+) -> Response:
+    instrumentation.request_started(
+        endpoint.path, endpoint.version, endpoint.method, attempt
+    )
+    start, counter = time.time(), time.perf_counter()
+    response = error = None
+    try:
+        response = send()
+        return response
+    except Exception as e:
+        # HTTP errors keep the response
+        response, error = getattr(e, "response", None), e
+        raise
+    finally:
+        instrumentation.request_finished(
+            _request_record(
+                endpoint,
+                attempt,
+                start,
+                time.perf_counter() - counter,
+                response,
+                error,
+            )
         )
 
-        with suppress(StopIteration):
-            # A yield receives a Pydantic object to store/process it internally, for example
-            generator.send(result)
 
-        return result
+async def _send_instrumented_async(
+    instrumentation: Instrumentation,
+    endpoint: _Endpoint,
+    attempt: int,
+    send: Callable[[], Awaitable[Response]],
+) -> Response:
+    instrumentation.request_started(
+        endpoint.path, endpoint.version, endpoint.method, attempt
+    )
+    start, counter = time.time(), time.perf_counter()
+    response = error = None
+    try:
+        response = await send()
+        return response
+    except Exception as e:
+        response, error = getattr(e, "response", None), e
+        raise
+    finally:
+        instrumentation.request_finished(
+            _request_record(
+                endpoint,
+                attempt,
+                start,
+                time.perf_counter() - counter,
+                response,
+                error,
+            )
+        )
+
+
+def _request(
+    self: "UklonAPI",
+    endpoint: _Endpoint,
+    path: str | tuple[str, ...],
+    request_kwargs: dict,
+) -> Response:
+    request = getattr(self, endpoint.method)
+    policy = self._retry_policy(endpoint)
+    if policy is not None:
+        self.retry_budget.deposit()
+
+    instrumentation = self.instrumentation
+    for attempt in count():
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(endpoint.path)
+        try:
+            if instrumentation is None:
+                return request(endpoint.version, path, **request_kwargs)
+            return _send_instrumented(
+                instrumentation,
+                endpoint,
+                attempt,
+                partial(request, endpoint.version, path, **request_kwargs),
+            )
+        except retryable_errors() as e:
+            if policy is None:
+                raise
+            delay = _retry_delay(self, endpoint, policy, e, attempt)
+            if delay is None:
+                raise
+            if instrumentation is not None:
+                instrumentation.retry(endpoint.path, endpoint.version, attempt, delay)
+            time.sleep(delay)
+
+
+async def _request_async(
+    self: "UklonAPI",
+    endpoint: _Endpoint,
+    path: str | tuple[str, ...],
+    request_kwargs: dict,
+) -> Response:
+    import asyncio
+
+    request = getattr(self, endpoint.method)
+    policy = self._retry_policy(endpoint)
+    if policy is not None:
+        self.retry_budget.deposit()
+
+    instrumentation = self.instrumentation
+    for attempt in count():
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(endpoint.path)
+        try:
+            if instrumentation is None:
+                return await request(endpoint.version, path, **request_kwargs)
+            return await _send_instrumented_async(
+                instrumentation,
+                endpoint,
+                attempt,
+                partial(request, endpoint.version, path, **request_kwargs),
+            )
+        except retryable_errors() as e:
+            if policy is None:
+                raise
+            delay = _retry_delay(self, endpoint, policy, e, attempt)
+            if delay is None:
+                raise
+            if instrumentation is not None:
+                instrumentation.retry(endpoint.path, endpoint.version, attempt, delay)
+            await asyncio.sleep(delay)
+
+
+def _validate(self: "UklonAPI", endpoint: _Endpoint, response: Response):
+    if self.instrumentation is None:
+        return endpoint.validate(response, self.lean_fields)
+    start, counter = time.time(), time.perf_counter()
+    result = endpoint.validate(response, self.lean_fields)
+    self.instrumentation.validated(
+        endpoint.path, endpoint.version, start, time.perf_counter() - counter
+    )
+    return result
+
+
+def _fetch(
+    self: "UklonAPI",
+    endpoint: _Endpoint,
+    path: str | tuple[str, ...],
+    request_kwargs: dict,
+):
+    response = _request(self, endpoint, path, request_kwargs)
+    return _validate(self, endpoint, response)
+
+
+async def _fetch_async(
+    self: "UklonAPI",
+    endpoint: _Endpoint,
+    path: str | tuple[str, ...],
+    request_kwargs: dict,
+):
+    response = await _request_async(self, endpoint, path, request_kwargs)
+    return _validate(self, endpoint, response)
+
+
+def _call(
+    self: "UklonAPI",
+    endpoint: _Endpoint,
+    generator: Generator,
+    path: str | tuple[str, ...],
+    request_kwargs: dict,
+    key: CacheKey | None,
+    cache: ResponseCache | None,
+):
+    cached = key is not None and cache is not None
+    result = cache.get(key) if cached else None
+    if result is None:
+        fetch = partial(_fetch, self, endpoint, path, request_kwargs)
+        if key is not None and endpoint.retry and self.single_flight is not None:
+            result = self.single_flight.do(key, fetch)
+        else:
+            result = fetch()
+        if cached:
+            cache.set(key, result, endpoint.ttl)
+    return _send(generator, result)
+
+
+async def _call_async(
+    self: "UklonAPI",
+    endpoint: _Endpoint,
+    generator: Generator,
+    path: str | tuple[str, ...],
+    request_kwargs: dict,
+    key: CacheKey | None,
+    cache: ResponseCache | None,
+):
+    cached = key is not None and cache is not None
+    result = cache.get(key) if cached else None
+    if result is None:
+        fetch = partial(_fetch_async, self, endpoint, path, request_kwargs)
+        if key is not None and endpoint.retry and self.single_flight is not None:
+            result = await self.single_flight.do_async(key, fetch)
+        else:
+            result = await fetch()
+        if cached:
+            cache.set(key, result, endpoint.ttl)
+    return _send(generator, result)
+
+
+def _uklon_api_wrapper(
+    f: FunctionType, method: APIMethod, version: APIVersion, **options
+):
+    endpoint = _Endpoint.from_function(f, method, version, **options)
 
+    @wraps(f)
+    def wrapper(self: "UklonAPI", *args, **kwargs):
+        call_kwargs = {**endpoint.defaults, **kwargs}
+
+        generator = (
+            f(self, *args, **call_kwargs)
+            if endpoint.generator
+            else (x(self, *args, **call_kwargs) for x in (f,))
+        )
+
+        # The first generator execution (or the first function call).
+        # Expecting the updated kwargs for request is yielded/returned or None
+        call_kwargs = next(generator, None) or call_kwargs
+
+        path = endpoint.request_path(args)
+        request_kwargs = endpoint.request_kwargs(call_kwargs)
+        cache = getattr(self, endpoint.cache) if endpoint.ttl else None
+        # A key identifies the call for caching and coalescing
+        key = (
+            self._cache_key(endpoint, path, call_kwargs, kwargs, cache)
+            if cache is not None or (endpoint.retry and self.single_flight is not None)
+            else None
+        )
+        args = (self, endpoint, generator, path, request_kwargs, key, cache)
+        if iscoroutinefunction(getattr(self, endpoint.method)):
+            # An asynchronous client, the request and the rest are awaited
+            return _call_async(*args)
+        return _call(*args)
+
+    wrapper.endpoint = endpoint
     return wrapper
 
 
@@ -123,25 +552,62 @@ def uklon_api(
     version: APIVersion = APIVersion.V1,
     *,
     json: bool = True,
+    ttl: float = None,
+    cache: str = "cache",
+    retry: bool | RetryPolicy = False,
+    authorized: bool = True,
 ):
+    # `ttl` allows caching results in the client's `cache` attribute,
+    # `retry` is for idempotent endpoints only,
+    # their identical concurrent calls can be coalesced as well.
+    # Requests of not `authorized` endpoints are sent without the auth
+    options = {
+        "json": json,
+        "ttl": ttl,
+        "cache": cache,
+        "retry": retry,
+        "authorized": authorized,
+    }
+
     if isfunction(method):
         # Function passed as the first argument
         f, method = method, APIMethod.GET
-        return _uklon_api_wrapper(f, method, version, json)
+        return _uklon_api_wrapper(f, method, version, **options)
 
     def decorator(f):
-        return _uklon_api_wrapper(f, method, version, json)
+        return _uklon_api_wrapper(f, method, version, **options)
 
     return decorator
 
 
-def handle_exception(exception: type[Exception] | tuple[type[Exception], ...]):
+def handle_exception(
+    exception: (
+        type[Exception]
+        | tuple[type[Exception], ...]
+        | Callable[[], tuple[type[Exception], ...]]
+    ),
+):
+    # A function returns the exceptions once one is raised (`http_errors` for example)
+    exceptions = exception if isfunction(exception) else lambda: exception
+
     def decorator(f):
+        if iscoroutinefunction(f):
+
+            @wraps(f)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    await f(*args, **kwargs)
+                except exceptions():
+                    return False
+                return True
+
+            return async_wrapper
+
         @wraps(f)
         def wrapper(*args, **kwargs):
             try:
                 f(*args, **kwargs)
-            except exception:
+            except exceptions():
                 return False
             return True
 
@@ -150,12 +616,40 @@ def handle_exception(exception: type[Exception] | tuple[type[Exception], ...]):
     return decorator
 
 
+@dataclass(frozen=True)
+class SessionContext:
+    me: Me
+    city: City | None
+    city_settings: CitySettings
+    favorite_addresses: FavoriteAddresses
+    payment_methods: PaymentMethods
+
+
 class UklonAPI:
     _base_url = "https://m.uklon.com.ua/api"
     _default_auth_filename = "auth.json"
 
     def __init__(
-        self, app_uid: str, client_id: str, client_secret: str, city_id: int = None
+        self,
+        app_uid: str,
+        client_id: str,
+        client_secret: str,
+        city_id: int = None,
+        *,
+        cache: ResponseCache = None,
+        fare_cache: FareCache = None,
+        store: ResponseStore = None,
+        auth_refresh_skew: float | None = 60,
+        transport_config: TransportConfig = None,
+        transport: Transport = None,
+        retry_policy: RetryPolicy | None = RetryPolicy(),
+        retry_budget: RetryBudget = None,
+        rate_limiter: RateLimiter = None,
+        single_flight: SingleFlight = None,
+        lean: Mapping[type[BaseModel], Iterable[str]] = None,
+        instrumentation: Instrumentation = None,
+        auth_store: AuthStore = None,
+        auth_key: str = None,
     ):
         self.app_uid = app_uid
         self.client_id = client_id
@@ -164,85 +658,352 @@ class UklonAPI:
         self.city_id = city_id
 
         self.auth: Auth | None = None
+        self._favorite_addresses: FavoriteAddresses | None = None
+        # The auth is refreshed that many seconds before it expires
+        # and on 401, `None` disables the automatic refresh
+        self.auth_refresh_skew = auth_refresh_skew
+        self._auth_lock = RLock()
+        self._auth_refresh_timer: Timer | None = None
+        # Guards the timer only, so stopping doesn't wait for a refresh in flight
+        self._auth_refresh_timer_lock = Lock()
+        # The auth shared with other clients and processes (`app_uid` is the key
+        # by default), only one of them refreshes it and the rest reuse it
+        self.auth_store = auth_store
+        self.auth_key = auth_key or app_uid
+
+        self.cache = cache
+        # Fare estimates are cached separately with their own TTL and stats
+        self.fare_cache = fare_cache
+        self.store = store
+        # Concurrent identical calls of idempotent endpoints share one request
+        self.single_flight = single_flight
+
+        # Only the selected fields of the models are parsed (the rest are `Unset`),
+        # for example `lean={orders_history.Order: {"id", "created_at", "status"}}`
+        self.lean_fields = None
+        if lean:
+            from .lean import lean_fields
+
+            self.lean_fields = lean_fields(lean)
+
+        # The policy of retryable endpoints, `None` disables retries.
+        # A budget can be shared by many clients to limit retries globally
+        self.retry_policy = retry_policy
+        self.retry_budget = retry_budget or RetryBudget()
+        self.retry_stats = RetryStats()
+
+        # Requests of the account wait for the limiter (retries included)
+        self.rate_limiter = rate_limiter
+
+        # Hooks of requests and validations, `MetricsCollector` for example
+        self.instrumentation = instrumentation
+
+        # A transport can be shared by clients of many accounts (see `UklonClientPool`)
+        self._transport = transport or self._create_transport(transport_config)
+        self._transport_owner = transport is None
+
+    @classmethod
+    def _create_transport(cls, config: TransportConfig = None) -> Transport:
+        return RequestsTransport(config or TransportConfig())
 
-        self._session = Session()
+    def close(self):
+        self.stop_auth_refresh()
+        if self._transport_owner:
+            self._transport.close()
 
     def _url(self, version: APIVersion, path: str | tuple[str, ...]) -> str:
         if isinstance(path, str):
             path = (path,)
         return "/".join((self._base_url, version, *path))
 
-    def _headers(self) -> dict[str, str]:
+    def _headers(self, authorized: bool = True) -> dict[str, str]:
         headers = {"app_uid": self.app_uid}
         if self.city_id:
             headers["city_id"] = str(self.city_id)
-        if self.auth:
+        if authorized and self.auth:
             headers["Authorization"] = (
                 f"{self.auth.token_type} {self.auth.access_token}"
             )
         return headers
 
+    def _retry_policy(self, endpoint: _Endpoint) -> RetryPolicy | None:
+        if isinstance(endpoint.retry, RetryPolicy):
+            return endpoint.retry
+        return self.retry_policy if endpoint.retry else None
+
+    def _cache_key(
+        self,
+        endpoint: _Endpoint,
+        path: str | tuple[str, ...],
+        params: dict,
+        kwargs: dict,
+        cache: ResponseCache | None,
+    ) -> CacheKey | None:
+        # An empty cache is falsy, hence no `cache or ResponseCache`
+        params_key = ResponseCache.params_key if cache is None else cache.params_key
+        params = params_key(params, kwargs)
+        if params is None:
+            return None
+        key = CacheKey(
+            account=self.auth_key,
+            city_id=self.city_id,
+            method=endpoint.method,
+            version=endpoint.version,
+            path=(path,) if isinstance(path, str) else path,
+            params=params,
+            lean=self.lean_fields,
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None  # unhashable params are never cached
+        return key
+
+    def cache_invalidate(self, *endpoints: Callable):
+        # Drop cached results of the given endpoint methods (all of them by default)
+        if not endpoints:
+            for cache in (self.cache, self.fare_cache):
+                if cache is not None:
+                    cache.invalidate(account=self.auth_key)
+        for endpoint in endpoints:
+            cache = getattr(self, endpoint.endpoint.cache)
+            if cache is not None:
+                cache.invalidate(endpoint.endpoint.path, account=self.auth_key)
+
+    def _store_key(self, url: str, params: dict | None) -> str:
+        return dumps(
+            [self.auth_key, self.city_id, url, sorted((params or {}).items())],
+            default=str,
+        )
+
+    def _auth_refresh_due(self) -> bool:
+        return (
+            self.auth is not None
+            and self.auth_refresh_skew is not None
+            and self.auth_expired(self.auth_refresh_skew)
+        )
+
+    def _authorize(self) -> Auth | None:
+        # Waits for a refresh in flight, so only one caller refreshes the auth
+        with self._auth_lock:
+            if self._auth_refresh_due():
+                self._refresh_auth(self.auth, self.auth_refresh_skew)
+            return self.auth
+
+    def _reauthorize(self, auth: Auth) -> bool:
+        # The auth has been rejected, refresh it unless another caller already did
+        with self._auth_lock:
+            if self.auth is auth:
+                self._refresh_auth(auth, self.auth_refresh_skew)
+            return self.auth is not None and self.auth is not auth
+
+    def _reuse_stored_auth(self, auth: Auth, skew: float) -> bool:
+        # Takes the auth refreshed by another client from the store
+        try:
+            stored = self.auth_store.load(self.auth_key)
+        except (KeyError, ValueError):
+            return False
+        if stored is None or stored.access_token == auth.access_token:
+            return False
+        self.auth = stored
+        return not self.auth_expired(skew)
+
+    def _refresh_auth(self, auth: Auth, skew: float):
+        if self.auth_store is None:
+            self._refresh_token()
+            return
+        with self.auth_store.lock(self.auth_key):
+            if not self._reuse_stored_auth(auth, skew):
+                self._refresh_token()  # saved to the store
+
+    def _refresh_token(self) -> bool:
+        # The current auth is kept if the refresh fails, it may be still valid
+        # and the refresh is tried again by the next request
+        try:
+            self.account__auth(
+                AuthGrantType.REFRESH_TOKEN, refresh_token=self.auth.refresh_token
+            )
+        except Exception:
+            logger.warning("Failed to refresh the auth", exc_info=True)
+            return False
+        return True
+
+    def _request(
+        self,
+        send: Callable[..., Response],
+        url: str,
+        headers=None,
+        authorized: bool = True,
+        **kwargs,
+    ) -> Response:
+        if not authorized:
+            return send(
+                url, headers={**self._headers(False), **(headers or {})}, **kwargs
+            )
+        auth = self._authorize()
+        response = send(url, headers={**self._headers(), **(headers or {})}, **kwargs)
+        if (
+            response.status_code == 401
+            and auth is not None
+            and self.auth_refresh_skew is not None
+            and self._reauthorize(auth)
+        ):
+            response = send(
+                url, headers={**self._headers(), **(headers or {})}, **kwargs
+            )
+        return response
+
     def get(
-        self, version: APIVersion, path: str | tuple[str, ...], *, params=None
+        self,
+        version: APIVersion,
+        path: str | tuple[str, ...],
+        *,
+        params=None,
+        authorized: bool = True,
     ) -> Response:
         url = self._url(version, path)
-        headers = self._headers()
-        response = self._session.get(url, headers=headers, params=params)
-        response.raise_for_status()
+        headers = {}
+        stored = None
+        if self.store is not None:
+            store_key = self._store_key(url, params)
+            if stored := self.store.get(store_key):
+                headers.update(stored.validators())
+        response = self._request(
+            self._transport.get, url, headers, authorized, params=params
+        )
+        if stored and response.status_code == 304:
+            # Not modified, the stored body is reused
+            response = self._transport.with_content(response, stored.content)
+        else:
+            response.raise_for_status()
+            if self.store is not None:
+                self._store_response(store_key, response)
         return response
 
+    def _store_response(self, store_key: str, response: Response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self.store.set(
+                store_key, StoredResponse(etag, last_modified, response.content)
+            )
+
     def post(
-        self, version: APIVersion, path: str | tuple[str, ...], *, data=None, json=None
+        self,
+        version: APIVersion,
+        path: str | tuple[str, ...],
+        *,
+        data=None,
+        json=None,
+        authorized: bool = True,
     ) -> Response:
         url = self._url(version, path)
-        headers = self._headers()
         json = json if data else (json or {})
-        response = self._session.post(url, headers=headers, data=data, json=json)
+        response = self._request(
+            self._transport.post, url, None, authorized, data=data, json=json
+        )
         response.raise_for_status()
         return response
 
-    @uklon_api(APIMethod.POST, json=False)
+    # The current auth is replaced only by a received one
+    @uklon_api(APIMethod.POST, json=False, authorized=False)
     def account__auth(self, grant_type, **kwargs) -> Auth:
-        self.auth = None  # it's necessary to set the auth to None before yielding
         self.auth = yield {
             "grant_type": grant_type,
             "client_id": self.client_id,
             "client_secret": self.client_secret,
             **kwargs,
         }
+        if self.auth_store is not None:
+            self.auth_store.save(self.auth_key, self.auth)
 
-    @handle_exception(IOError)
+    @handle_exception(http_errors)
     def account_auth_password(self, username: str, password: str):
         self.account__auth(AuthGrantType.PASSWORD, username=username, password=password)
 
-    @handle_exception((AttributeError, IOError))
+    @handle_exception(lambda: (AttributeError, *http_errors()))
     def account_auth_refresh_token(self):
         refresh_token = self.auth.refresh_token
         self.account__auth(AuthGrantType.REFRESH_TOKEN, refresh_token=refresh_token)
 
+    # The auth store is used unless a file is given
     @handle_exception(AttributeError)
     def auth_save(self, filename: str = None):
+        if self.auth is None:
+            raise AttributeError("There is no auth to save")
+        if filename is None and self.auth_store is not None:
+            self.auth_store.save(self.auth_key, self.auth)
+            return
         json = self.auth.model_dump_json(indent=2) + "\n"
-        Path(filename or self._default_auth_filename).write_text(json)
+        write_atomic(Path(filename or self._default_auth_filename), json)
 
-    @handle_exception((OSError, ValueError))
+    @handle_exception((OSError, ValueError, KeyError))
     def auth_load(self, filename: str = None):
+        if filename is None and self.auth_store is not None:
+            self.auth = self.auth_store.load(self.auth_key)
+            return
+        from .types.account import Auth
+
         json = Path(filename or self._default_auth_filename).read_text()
         self.auth = Auth.model_validate_json(json)
 
-    def auth_expired(self):
-        return self.auth.access_token_exp < time.time()
+    def auth_expired(self, skew: float = 0):
+        return self.auth.expires_after() < skew
+
+    def _auth_refresh_delay(self, lead: float) -> float | None:
+        if self.auth is None:
+            return None
+        return max(
+            0.0, self.auth.expires_after() - (self.auth_refresh_skew or 0) - lead
+        )
+
+    def start_auth_refresh(self, lead: float = 30, retry_interval: float = 30):
+        # Refreshes the auth in the background `lead` seconds before
+        # the requests would do it, so they don't wait for the refresh
+        self.stop_auth_refresh()
+        with self._auth_refresh_timer_lock:
+            self._schedule_auth_refresh(
+                self._auth_refresh_delay(lead) or 0, lead, retry_interval
+            )
+
+    def stop_auth_refresh(self):
+        with self._auth_refresh_timer_lock:
+            timer, self._auth_refresh_timer = self._auth_refresh_timer, None
+        if timer is not None:
+            timer.cancel()
 
-    @uklon_api
+    def _schedule_auth_refresh(self, delay: float, lead: float, retry_interval: float):
+        timer = Timer(delay, self._refresh_auth_scheduled, (lead, retry_interval))
+        timer.daemon = True
+        self._auth_refresh_timer = timer
+        timer.start()
+
+    def _refresh_auth_scheduled(self, lead: float, retry_interval: float):
+        with self._auth_lock:
+            if self._auth_refresh_timer is not current_thread():
+                return  # stopped or restarted
+            skew = (self.auth_refresh_skew or 0) + lead
+            if self.auth is not None and self.auth_expired(skew):
+                self._refresh_auth(self.auth, skew)
+            # Retried later if the refresh has failed or there is no auth yet
+            delay = self._auth_refresh_delay(lead) or retry_interval
+        with self._auth_refresh_timer_lock:
+            # Not re-armed if stopped or restarted during the refresh
+            if self._auth_refresh_timer is current_thread():
+                self._schedule_auth_refresh(delay, lead, retry_interval)
+
+    @uklon_api(ttl=24 * 60 * 60, retry=True)
     def cities(self) -> Cities: ...
 
-    @uklon_api(version=APIVersion.V2)
+    @uklon_api(version=APIVersion.V2, ttl=60 * 60, retry=True)
     def city_settings(self) -> CitySettings: ...
 
-    @uklon_api
-    def favorite_addresses(self) -> FavoriteAddresses: ...
+    @uklon_api(ttl=5 * 60, retry=True)
+    def favorite_addresses(self) -> FavoriteAddresses:
+        # Kept to name raw coordinates of a fare estimate route
+        self._favorite_addresses = yield
 
-    @uklon_api
+    @uklon_api(retry=True)
     def me(self, update_city=False) -> Me:
         if update_city:
             self.city_id = (yield).city_id
@@ -250,18 +1011,91 @@ class UklonAPI:
     def update_city(self):
         return self.me(update_city=True)
 
-    @uklon_api(APIMethod.POST, APIVersion.V2)
+    def bootstrap(self) -> SessionContext:
+        # Authorizes (refreshes the auth if needed) and then fetches the session
+        # context concurrently, the endpoints with a TTL are cached on the way.
+        # If the city isn't set, it's taken from `me` before the rest
+        self._authorize()
+        with ThreadPoolExecutor(5) as executor:
+            me = executor.submit(self.me, update_city=self.city_id is None)
+            if self.city_id is None:
+                me.result()
+            cities = executor.submit(self.cities)
+            city_settings = executor.submit(self.city_settings)
+            favorite_addresses = executor.submit(self.favorite_addresses)
+            payment_methods = executor.submit(self.payment_methods)
+            return SessionContext(
+                me=me.result(),
+                city=cities.result().get(self.city_id),
+                city_settings=city_settings.result(),
+                favorite_addresses=favorite_addresses.result(),
+                payment_methods=payment_methods.result(),
+            )
+
+    @uklon_api(APIMethod.POST, APIVersion.V2, ttl=5 * 60, retry=True)
     def payment_methods(self) -> PaymentMethods: ...
 
-    @uklon_api
+    @uklon_api(retry=True)
     def orders_history(
         self, page: int = None, page_size: int = None, *, include_statistic: bool = None
     ) -> OrdersHistory | OrdersHistoryStats: ...
 
-    @uklon_api(APIMethod.POST)
+    def _iter_orders_history_pages(
+        self, page: int = 1, page_size: int = None, prefetch: int = 1
+    ) -> Iterator[tuple[int, OrdersHistory]]:
+        # Up to `prefetch` next pages are fetched in the background
+        # while the current one is being processed
+        executor = ThreadPoolExecutor(max(prefetch, 1))
+        pending: deque[tuple[int, Future[OrdersHistory]]] = deque()
+        try:
+            while True:
+                while len(pending) <= prefetch:
+                    kwargs = {"page": page, "page_size": page_size}
+                    future = executor.submit(
+                        self.orders_history,
+                        **{k: v for k, v in kwargs.items() if v is not None},
+                    )
+                    pending.append((page, future))
+                    page += 1
+                page_number, future = pending.popleft()
+                orders_history = future.result()
+                yield page_number, orders_history
+                if not orders_history.has_more_items:
+                    break
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def iter_orders_history(
+        self, page_size: int = None, prefetch: int = 1, *, since: datetime = None
+    ) -> Iterator[HistoryOrder]:
+        # Orders are expected newest first, so the iteration stops at the first order
+        # created before `since`
+        with closing(
+            self._iter_orders_history_pages(page_size=page_size, prefetch=prefetch)
+        ) as pages:
+            for _, orders_history in pages:
+                for order in orders_history.items:
+                    if since and order.created_at < since:
+                        return
+                    yield order
+
+    def _route_point(self, point: Point | Address | tuple[float, float]) -> Point:
+        from .types.address import Address
+        from .types.fare_estimate import Point
+
+        if isinstance(point, Address):
+            return Point.from_address(point)
+        if isinstance(point, tuple):
+            # Raw coordinates are named after the favorite addresses if fetched
+            return Point.from_coordinates(*point, self._favorite_addresses)
+        return point
+
+    # Retrying is safe as the estimate is keyed by `fare_id`.
+    # Estimates are cached only if the client has a `fare_cache`
+    @uklon_api(APIMethod.POST, ttl=30, cache="fare_cache", retry=True)
     def fare_estimate(
         self,
-        route: list[Point | Address],
+        route: list[Point | Address | tuple[float, float]],
         entrance: int = None,
         *,
         payment_method: PaymentMethod = None,
@@ -271,17 +1105,12 @@ class UklonAPI:
         fare_id: UUID = None,
         selected_options: SelectedOptions = None,
     ) -> FareEstimate:
+        from .types.fare_estimate import RideCondition
+
         data = {
             "fare_id": str(fare_id or uuid4()),
             "route": {
-                "points": [
-                    (
-                        Point.from_address(point)
-                        if isinstance(point, Address)
-                        else point
-                    ).model_dump()
-                    for point in route
-                ],
+                "points": [self._route_point(point).model_dump() for point in route],
             },
         }
         if entrance:
@@ -305,9 +1134,37 @@ class UklonAPI:
             data["selected_options"] = selected_options.model_dump()
         yield data
 
+    def _fare_estimate_or_error(
+        self, request: Mapping[str, Any]
+    ) -> FareEstimate | Exception:
+        try:
+            return self.fare_estimate(**request)
+        except Exception as e:
+            return e
+
+    def fare_estimate_many(
+        self,
+        requests: Iterable[Mapping[str, Any]],
+        max_concurrency: int = 10,
+        *,
+        ordered: bool = True,
+    ) -> Iterator[FareEstimate | Exception]:
+        # Every request is a mapping of `fare_estimate` arguments.
+        # A failed request yields its exception instead of aborting the batch
+        executor = ThreadPoolExecutor(max_concurrency)
+        try:
+            futures = [
+                executor.submit(self._fare_estimate_or_error, request)
+                for request in requests
+            ]
+            for future in futures if ordered else as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
     @overload
     def orders(self) -> list[Order]: ...
     @overload
     def orders(self, order_id: str, /) -> Order: ...
-    @uklon_api
+    @uklon_api(retry=True)
     def orders(self, order_id: str = None, /): ...
@@ -0,0 +1,284 @@
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Mapping
+
+from httpx import HTTPError, Response
+
+from .api import (
+    APIVersion,
+    AuthGrantType,
+    SessionContext,
+    UklonAPI,
+    handle_exception,
+    logger,
+)
+from .transport import AsyncHTTPXTransport, TransportConfig
+from .types.account import Auth
+from .types.fare_estimate import FareEstimate
+from .types.orders_history import Order as HistoryOrder
+from .types.orders_history import OrdersHistory
+
+
+class AsyncUklonAPI(UklonAPI):
+    _transport: AsyncHTTPXTransport
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._auth_lock = asyncio.Lock()
+        self._auth_refresh_task: asyncio.Task | None = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def close(self):
+        raise TypeError(
+            f"{self.__class__.__name__} is closed asynchronously, use `await aclose()`"
+        )
+
+    async def aclose(self):
+        self.stop_auth_refresh()
+        if self._transport_owner:
+            await self._transport.aclose()
+
+    @classmethod
+    def _create_transport(cls, config: TransportConfig = None) -> AsyncHTTPXTransport:
+        return AsyncHTTPXTransport(config or TransportConfig())
+
+    async def _authorize(self) -> Auth | None:
+        async with self._auth_lock:
+            if self._auth_refresh_due():
+                await self._refresh_auth(self.auth, self.auth_refresh_skew)
+            return self.auth
+
+    async def _reauthorize(self, auth: Auth) -> bool:
+        async with self._auth_lock:
+            if self.auth is auth:
+                await self._refresh_auth(auth, self.auth_refresh_skew)
+            return self.auth is not None and self.auth is not auth
+
+    async def _refresh_auth(self, auth: Auth, skew: float):
+        if self.auth_store is None:
+            await self._refresh_token()
+            return
+        lock = self.auth_store.lock(self.auth_key)
+        # The lock may block (another process refreshes), it's taken in a thread
+        acquire = asyncio.ensure_future(asyncio.to_thread(lock.acquire))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # Released once taken, nobody is waiting for it anymore
+            acquire.add_done_callback(
+                lambda f: f.cancelled() or f.exception() or lock.release()
+            )
+            raise
+        try:
+            if not self._reuse_stored_auth(auth, skew):
+                await self._refresh_token()  # saved to the store
+        finally:
+            lock.release()
+
+    async def _refresh_token(self) -> bool:
+        try:
+            await self.account__auth(
+                AuthGrantType.REFRESH_TOKEN, refresh_token=self.auth.refresh_token
+            )
+        except Exception:
+            logger.warning("Failed to refresh the auth", exc_info=True)
+            return False
+        return True
+
+    def start_auth_refresh(self, lead: float = 30, retry_interval: float = 30):
+        # Runs in a task of the running loop
+        self.stop_auth_refresh()
+        self._auth_refresh_task = asyncio.get_running_loop().create_task(
+            self._refresh_auth_scheduled(lead, retry_interval)
+        )
+
+    def stop_auth_refresh(self):
+        task, self._auth_refresh_task = self._auth_refresh_task, None
+        if task is not None:
+            task.cancel()
+
+    async def _refresh_auth_scheduled(self, lead: float, retry_interval: float):
+        delay = self._auth_refresh_delay(lead) or 0
+        while True:
+            await asyncio.sleep(delay)
+            async with self._auth_lock:
+                skew = (self.auth_refresh_skew or 0) + lead
+                if self.auth is not None and self.auth_expired(skew):
+                    await self._refresh_auth(self.auth, skew)
+            delay = self._auth_refresh_delay(lead) or retry_interval
+
+    async def _request(
+        self,
+        send: Callable[..., Awaitable[Response]],
+        url: str,
+        headers=None,
+        authorized: bool = True,
+        **kwargs,
+    ) -> Response:
+        if not authorized:
+            return await send(
+                url, headers={**self._headers(False), **(headers or {})}, **kwargs
+            )
+        auth = await self._authorize()
+        response = await send(
+            url, headers={**self._headers(), **(headers or {})}, **kwargs
+        )
+        if (
+            response.status_code == 401
+            and auth is not None
+            and self.auth_refresh_skew is not None
+            and await self._reauthorize(auth)
+        ):
+            response = await send(
+                url, headers={**self._headers(), **(headers or {})}, **kwargs
+            )
+        return response
+
+    async def get(
+        self,
+        version: APIVersion,
+        path: str | tuple[str, ...],
+        *,
+        params=None,
+        authorized: bool = True,
+    ) -> Response:
+        url = self._url(version, path)
+        headers = {}
+        stored = None
+        if self.store is not None:
+            store_key = self._store_key(url, params)
+            if stored := self.store.get(store_key):
+                headers.update(stored.validators())
+        response = await self._request(
+            self._transport.get, url, headers, authorized, params=params
+        )
+        if stored and response.status_code == 304:
+            # Not modified, the stored body is reused
+            response = self._transport.with_content(response, stored.content)
+        else:
+            response.raise_for_status()
+            if self.store is not None:
+                self._store_response(store_key, response)
+        return response
+
+    async def post(
+        self,
+        version: APIVersion,
+        path: str | tuple[str, ...],
+        *,
+        data=None,
+        json=None,
+        authorized: bool = True,
+    ) -> Response:
+        url = self._url(version, path)
+        json = json if data else (json or {})
+        response = await self._request(
+            self._transport.post, url, None, authorized, data=data, json=json
+        )
+        response.raise_for_status()
+        return response
+
+    @handle_exception(HTTPError)
+    async def account_auth_password(self, username: str, password: str):
+        await self.account__auth(
+            AuthGrantType.PASSWORD, username=username, password=password
+        )
+
+    @handle_exception((AttributeError, HTTPError))
+    async def account_auth_refresh_token(self):
+        refresh_token = self.auth.refresh_token
+        await self.account__auth(
+            AuthGrantType.REFRESH_TOKEN, refresh_token=refresh_token
+        )
+
+    async def bootstrap(self) -> SessionContext:
+        await self._authorize()
+        try:
+            async with asyncio.TaskGroup() as group:
+                me = group.create_task(self.me(update_city=self.city_id is None))
+                if self.city_id is None:
+                    await me
+                cities = group.create_task(self.cities())
+                city_settings = group.create_task(self.city_settings())
+                favorite_addresses = group.create_task(self.favorite_addresses())
+                payment_methods = group.create_task(self.payment_methods())
+        except ExceptionGroup as e:
+            # The first error, as the synchronous client raises it
+            raise e.exceptions[0]
+        return SessionContext(
+            me=me.result(),
+            city=cities.result().get(self.city_id),
+            city_settings=city_settings.result(),
+            favorite_addresses=favorite_addresses.result(),
+            payment_methods=payment_methods.result(),
+        )
+
+    async def fare_estimate_many(
+        self,
+        requests: Iterable[Mapping[str, Any]],
+        max_concurrency: int = 10,
+        *,
+        ordered: bool = True,
+    ) -> AsyncIterator[FareEstimate | Exception]:
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fare_estimate_or_error(request: Mapping[str, Any]):
+            async with semaphore:
+                try:
+                    return await self.fare_estimate(**request)
+                except Exception as e:
+                    return e
+
+        tasks = [
+            asyncio.ensure_future(fare_estimate_or_error(request))
+            for request in requests
+        ]
+        try:
+            for task in tasks if ordered else asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _iter_orders_history_pages(
+        self, page: int = 1, page_size: int = None, prefetch: int = 1
+    ) -> AsyncIterator[tuple[int, OrdersHistory]]:
+        pending: deque[tuple[int, asyncio.Future[OrdersHistory]]] = deque()
+        try:
+            while True:
+                while len(pending) <= prefetch:
+                    kwargs = {"page": page, "page_size": page_size}
+                    task = asyncio.ensure_future(
+                        self.orders_history(
+                            **{k: v for k, v in kwargs.items() if v is not None}
+                        )
+                    )
+                    pending.append((page, task))
+                    page += 1
+                page_number, task = pending.popleft()
+                orders_history = await task
+                yield page_number, orders_history
+                if not orders_history.has_more_items:
+                    break
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def iter_orders_history(
+        self, page_size: int = None, prefetch: int = 1, *, since: datetime = None
+    ) -> AsyncIterator[HistoryOrder]:
+        async with aclosing(
+            self._iter_orders_history_pages(page_size=page_size, prefetch=prefetch)
+        ) as pages:
+            async for _, orders_history in pages:
+                for order in orders_history.items:
+                    if since and order.created_at < since:
+                        return
+                    yield order
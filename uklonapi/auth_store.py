@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from collections import defaultdict
+from contextlib import suppress
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from .types.account import Auth
+
+try:
+    import fcntl
+except ImportError:  # Windows, only threads of one process are locked out
+    fcntl = None
+
+
+class AuthLock(Protocol):
+    def acquire(self): ...
+
+    def release(self): ...
+
+    def __enter__(self): ...
+
+    def __exit__(self, *exc_info): ...
+
+
+class AuthStore(Protocol):
+    # Auths of accounts shared by clients, `load` raises `KeyError` if there is none.
+    # The refresh is made under the lock, so only one client refreshes the auth
+    def load(self, key: str) -> Auth: ...
+
+    def save(self, key: str, auth: Auth): ...
+
+    def lock(self, key: str) -> AuthLock: ...
+
+
+def write_atomic(path: Path, text: str):
+    # Readers get either the old or the new file, never a partially written one
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(temp)
+        raise
+
+
+class _FileLock:
+    # An advisory lock, every acquire opens the file to lock out
+    # other processes and other threads as well
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        file = open(self.path, "a")
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        except BaseException:
+            file.close()
+            raise
+        self._file = file
+
+    def release(self):
+        file, self._file = self._file, None
+        try:
+            fcntl.flock(file, fcntl.LOCK_UN)
+        finally:
+            file.close()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class FileAuthStore:
+    # An auth file per account in the directory shared by processes.
+    # A file is read again only if it has been changed (by another process)
+    def __init__(self, directory: str = "."):
+        self.directory = Path(directory)
+        self._loaded: dict[str, tuple[tuple[int, ...], Auth]] = {}
+        self._locks: defaultdict[str, Lock] = defaultdict(Lock)
+        self._lock = Lock()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    @staticmethod
+    def _version(path: Path) -> tuple[int, ...]:
+        stat = path.stat()
+        # A replaced file has another inode even if the time is the same
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def load(self, key: str) -> Auth:
+        from .types.account import Auth
+
+        path = self.path(key)
+        try:
+            version = self._version(path)
+            loaded = self._loaded.get(key)
+            if loaded is not None and loaded[0] == version:
+                return loaded[1]
+            auth = Auth.model_validate_json(path.read_bytes())
+        except FileNotFoundError:
+            raise KeyError(key) from None
+        with self._lock:
+            self._loaded[key] = version, auth
+        return auth
+
+    def save(self, key: str, auth: Auth):
+        path = self.path(key)
+        write_atomic(path, auth.model_dump_json(indent=2) + "\n")
+        with self._lock:
+            self._loaded[key] = self._version(path), auth
+
+    def lock(self, key: str) -> AuthLock:
+        if fcntl is None:
+            with self._lock:
+                return self._locks[key]
+        return _FileLock(self.directory / f"{key}.json.lock")
+
+
+class MemoryAuthStore:
+    # Shared by clients in threads of one process
+    def __init__(self):
+        self._auths: dict[str, Auth] = {}
+        self._locks: defaultdict[str, Lock] = defaultdict(Lock)
+        self._lock = Lock()
+
+    def load(self, key: str) -> Auth:
+        auth = self._auths.get(key)
+        if auth is None:
+            raise KeyError(key)
+        return auth
+
+    def save(self, key: str, auth: Auth):
+        self._auths[key] = auth
+
+    def lock(self, key: str) -> AuthLock:
+        with self._lock:
+            return self._locks[key]
@@ -0,0 +1,181 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, NamedTuple, Protocol
+
+
+class CacheKey(NamedTuple):
+    account: str  # `auth_key`, accounts may share an `app_uid`
+    city_id: int | None
+    method: str
+    version: str
+    path: tuple[str, ...]
+    params: Hashable
+    lean: Hashable = None
+
+
+class ResponseCache:
+    # Stores already validated results of endpoints declared with a TTL
+    # and evicts the least recently used ones when `maxsize` is reached
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[CacheKey, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(size={len(self)}, maxsize={self.maxsize}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @staticmethod
+    def params_key(params: dict, kwargs: dict) -> Hashable | None:
+        # Identifies the request parameters of a call within the endpoint
+        return tuple(sorted(params.items()))
+
+    def get(self, key: CacheKey) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: CacheKey, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: str = None, *, account: str = None):
+        with self._lock:
+            for key in [
+                key
+                for key in self._entries
+                if (path is None or key.path[0] == path)
+                if (account is None or key.account == account)
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+class FareCache(ResponseCache):
+    # Memoizes fare estimates of the same routes requested within seconds.
+    # Points are rounded to `precision` decimal places (4 is about 11 meters)
+    # and the pickup time falls into `time_bucket` seconds long buckets.
+    # `ttl` overrides the one of the endpoint, keep it short as the surge changes
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = None,
+        *,
+        precision: int = 4,
+        time_bucket: float = 300,
+    ):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.precision = precision
+        self.time_bucket = time_bucket
+
+    def params_key(self, params: dict, kwargs: dict) -> Hashable | None:
+        if kwargs.get("fare_id"):
+            return None  # the caller asked for the particular estimate
+        route = params["route"]
+        pickup_time = params.get("pickup_time")
+        return (
+            tuple(
+                (
+                    round(point["lat"], self.precision),
+                    round(point["lng"], self.precision),
+                )
+                for point in route["points"]
+            ),
+            route.get("entrance"),
+            frozenset(
+                (condition["name"], condition.get("comment"))
+                for condition in params.get("ride_conditions", ())
+            ),
+            params.get("payment_method", {}).get("id"),
+            pickup_time // self.time_bucket if pickup_time else None,
+            params.get("include_route_info"),
+            tuple(sorted(params.get("selected_options", {}).items())),
+        )
+
+    # Every caller gets its own copy, so the cached estimate can't be changed
+    def get(self, key: CacheKey) -> Any | None:
+        value = super().get(key)
+        return value.model_copy(deep=True) if value is not None else None
+
+    def set(self, key: CacheKey, value: Any, ttl: float):
+        super().set(key, value.model_copy(deep=True), self.ttl or ttl)
+
+
+class StoredResponse(NamedTuple):
+    etag: str | None
+    last_modified: str | None
+    content: bytes
+
+    def validators(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseStore(Protocol):
+    def get(self, key: str) -> StoredResponse | None: ...
+
+    def set(self, key: str, response: StoredResponse): ...
+
+
+class SQLiteResponseStore:
+    # Persists raw response bodies with their validators (ETag/Last-Modified)
+    # to revalidate them with conditional requests after a restart
+    def __init__(self, filename: str = "responses.sqlite3"):
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content BLOB)"
+        )
+        self._lock = Lock()
+
+    def get(self, key: str) -> StoredResponse | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, last_modified, content FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return StoredResponse(*row) if row else None
+
+    def set(self, key: str, response: StoredResponse):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, *response),
+            )
+
+    def close(self):
+        self._connection.close()
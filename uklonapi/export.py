@@ -0,0 +1,207 @@
+import csv
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from .api import UklonAPI
+from .auth_store import write_atomic
+from .types import Unset
+from .types.orders_history import Order
+
+# Flat columns of an order and their types
+COLUMNS: dict[str, type] = {
+    "id": str,
+    "created_at": datetime,
+    "pickup_time": datetime,
+    "status": str,
+    "product_type": str,
+    "order_system": str,
+    "rating": int,
+    "cancel_reason": str,
+    "donation_amount": int,
+    "cost": int,
+    "cost_currency": str,
+    "payment_method_id": str,
+    "payment_method_type": str,
+    "payment_method_description": str,
+    "payment_method_card_type": str,
+    "route_comment": str,
+    "route_points": int,
+    "pickup_address": str,
+    "pickup_lat": float,
+    "pickup_lng": float,
+    "dropoff_address": str,
+    "dropoff_lat": float,
+    "dropoff_lng": float,
+}
+
+
+def _value(value):
+    return None if value is Unset else value
+
+
+def flatten_order(order: Order) -> dict[str, Any]:
+    points = order.route.points
+    pickup = points[0] if points else None
+    dropoff = points[-1] if len(points) > 1 else None
+    return {
+        "id": order.id,
+        "created_at": order.created_at,
+        "pickup_time": order.pickup_time,
+        "status": order.status,
+        "product_type": order.product_type,
+        "order_system": order.order_system,
+        "rating": order.rating,
+        "cancel_reason": order.cancel_reason,
+        "donation_amount": order.donation_amount,
+        "cost": order.cost.cost,
+        "cost_currency": order.cost.currency,
+        "payment_method_id": order.payment_method.id,
+        "payment_method_type": order.payment_method.payment_type,
+        "payment_method_description": _value(order.payment_method.description),
+        "payment_method_card_type": _value(order.payment_method.card_type),
+        "route_comment": order.route.comment,
+        "route_points": len(points),
+        "pickup_address": pickup and pickup.address_name,
+        "pickup_lat": pickup and pickup.lat,
+        "pickup_lng": pickup and pickup.lng,
+        "dropoff_address": dropoff and dropoff.address_name,
+        "dropoff_lat": dropoff and dropoff.lat,
+        "dropoff_lng": dropoff and dropoff.lng,
+    }
+
+
+class _CSVWriter:
+    # Rows written after the checkpointed offset (by an interrupted export)
+    # are truncated, so a resumed export doesn't duplicate them
+    def __init__(self, path: Path, offset: int = None):
+        if offset is not None and path.exists():
+            os.truncate(path, offset)
+        new = not path.exists() or not path.stat().st_size
+        self._file = path.open("a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=list(COLUMNS))
+        if new:
+            self._writer.writeheader()
+
+    def write(self, rows: list[dict[str, Any]], part: int):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    @property
+    def offset(self) -> int:
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    # A dataset directory with a file per batch, so an export can be resumed
+    def __init__(self, path: Path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {
+            str: pa.string(),
+            int: pa.int64(),
+            float: pa.float64(),
+            datetime: pa.timestamp("us", tz="UTC"),
+        }
+        self._pa = pa
+        self._pq = pq
+        self._schema = pa.schema(
+            [(name, types[type_]) for name, type_ in COLUMNS.items()]
+        )
+        self._path = path
+        path.mkdir(parents=True, exist_ok=True)
+
+    def write(self, rows: list[dict[str, Any]], part: int):
+        table = self._pa.Table.from_pylist(rows, schema=self._schema)
+        self._pq.write_table(table, self._path / f"part-{part:06d}.parquet")
+
+    @property
+    def offset(self) -> None:
+        return None  # part files are overwritten by name
+
+    def close(self):
+        pass
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _batches(rows: Iterable, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_orders_history(
+    api: UklonAPI,
+    path: str,
+    format: str = None,
+    *,
+    page_size: int = 100,
+    batch_pages: int = 10,
+    prefetch: int = 1,
+    resume: bool = True,
+) -> int:
+    # Streams the order history to `path`: a Parquet dataset directory
+    # (requires `pyarrow`) or a CSV file, `batch_pages` pages at a time.
+    # The last written page is checkpointed next to the output to resume
+    # an interrupted export, the checkpoint is removed once it's complete
+    path = Path(path)
+    if format is None:
+        if path.suffix in (".csv", ".parquet"):
+            format = path.suffix[1:]
+        else:
+            format = "parquet" if _parquet_available() else "csv"
+    checkpoint = path.with_name(path.name + ".checkpoint")
+
+    page, offset = 1, None
+    if resume and checkpoint.exists():
+        state = json.loads(checkpoint.read_text())
+        if state["page_size"] == page_size:
+            page, offset = state["page"] + 1, state.get("offset")
+    if page == 1:
+        # A new export
+        if path.is_file():
+            path.unlink()
+        elif path.is_dir():
+            for part in path.glob("part-*.parquet"):
+                part.unlink()
+
+    writer = _ParquetWriter(path) if format == "parquet" else _CSVWriter(path, offset)
+    written = 0
+    try:
+        pages = api._iter_orders_history_pages(page, page_size, prefetch)
+        for batch in _batches(pages, batch_pages):
+            rows = [
+                flatten_order(order)
+                for _, orders_history in batch
+                for order in orders_history.items
+            ]
+            last_page = batch[-1][0]
+            if rows:
+                writer.write(rows, last_page)
+                written += len(rows)
+            state = {"page": last_page, "page_size": page_size}
+            if writer.offset is not None:
+                state["offset"] = writer.offset
+            write_atomic(checkpoint, json.dumps(state))
+    finally:
+        writer.close()
+    checkpoint.unlink()
+    return written
@@ -0,0 +1,129 @@
+from math import asin, cos, pi, radians, sin, sqrt
+from typing import Callable, Generic, Iterable, Protocol, TypeVar
+
+EARTH_RADIUS = 6_371_000  # meters
+
+T = TypeVar("T")
+
+
+class LatLng(Protocol):
+    lat: float
+    lng: float
+
+
+Coordinates = LatLng | tuple[float, float]
+
+
+def _lat_lng(point: Coordinates) -> tuple[float, float]:
+    if isinstance(point, tuple):
+        return point
+    return point.lat, point.lng
+
+
+def _xyz(lat: float, lng: float) -> tuple[float, float, float]:
+    # A point on the unit sphere, a chord between two points grows with the distance
+    lat, lng = radians(lat), radians(lng)
+    return cos(lat) * cos(lng), cos(lat) * sin(lng), sin(lat)
+
+
+def _chord2(a: tuple[float, ...], b: tuple[float, ...]) -> float:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+def _distance(chord2: float) -> float:
+    return 2 * EARTH_RADIUS * asin(min(1.0, sqrt(chord2) / 2))
+
+
+def _chord2_max(radius: float) -> float:
+    return (2 * sin(min(radius / EARTH_RADIUS, pi) / 2)) ** 2
+
+
+def haversine(a: Coordinates, b: Coordinates) -> float:
+    # Distance in meters
+    (a_lat, a_lng), (b_lat, b_lng) = _lat_lng(a), _lat_lng(b)
+    dlat = radians(b_lat - a_lat)
+    dlng = radians(b_lng - a_lng)
+    h = (
+        sin(dlat / 2) ** 2
+        + cos(radians(a_lat)) * cos(radians(b_lat)) * sin(dlng / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * asin(min(1.0, sqrt(h)))
+
+
+class SpatialIndex(Generic[T]):
+    # A k-d tree over points on the unit sphere
+    def __init__(self, items: Iterable[T], location: Callable[[T], Coordinates]):
+        self._root = self._build(
+            [(_xyz(*_lat_lng(location(item))), item) for item in items], 0
+        )
+
+    def _build(self, nodes: list, axis: int):
+        if not nodes:
+            return None
+        nodes.sort(key=lambda node: node[0][axis])
+        median = len(nodes) // 2
+        next_axis = (axis + 1) % 3
+        return (
+            *nodes[median],
+            axis,
+            self._build(nodes[:median], next_axis),
+            self._build(nodes[median + 1 :], next_axis),
+        )
+
+    def nearest(
+        self, point: Coordinates, max_distance: float = None
+    ) -> tuple[T, float] | None:
+        # The nearest item and the distance to it in meters
+        target = _xyz(*_lat_lng(point))
+        best = [
+            None,
+            _chord2_max(max_distance) if max_distance is not None else float("inf"),
+        ]
+
+        def search(node):
+            if node is None:
+                return
+            xyz, item, axis, left, right = node
+            if (chord2 := _chord2(xyz, target)) < best[1]:
+                best[:] = item, chord2
+            diff = target[axis] - xyz[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            search(near)
+            if diff * diff < best[1]:
+                search(far)
+
+        search(self._root)
+        item, chord2 = best
+        return (item, _distance(chord2)) if item is not None else None
+
+    def within(self, point: Coordinates, radius: float) -> list[tuple[T, float]]:
+        # Items with distances in meters, the nearest first
+        target = _xyz(*_lat_lng(point))
+        chord2_max = _chord2_max(radius)
+        found = []
+
+        def search(node):
+            if node is None:
+                return
+            xyz, item, axis, left, right = node
+            if (chord2 := _chord2(xyz, target)) <= chord2_max:
+                found.append((chord2, item))
+            diff = target[axis] - xyz[axis]
+            if diff <= 0 or diff * diff <= chord2_max:
+                search(left)
+            if diff >= 0 or diff * diff <= chord2_max:
+                search(right)
+
+        search(self._root)
+        found.sort(key=lambda x: x[0])
+        return [(item, _distance(chord2)) for chord2, item in found]
+
+    def nearest_many(
+        self, points: Iterable[Coordinates], max_distance: float = None
+    ) -> list[tuple[T, float] | None]:
+        return [self.nearest(point, max_distance) for point in points]
+
+    def within_many(
+        self, points: Iterable[Coordinates], radius: float
+    ) -> list[list[tuple[T, float]]]:
+        return [self.within(point, radius) for point in points]
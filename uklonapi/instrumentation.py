@@ -0,0 +1,269 @@
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Protocol, Sequence
+
+# Seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+@dataclass(frozen=True, slots=True)
+class RequestRecord:
+    path: str
+    version: str
+    method: str
+    attempt: int
+    start: float  # `time.time()`
+    duration: float
+    status: int | None  # `None` if no response was received
+    bytes_in: int
+    bytes_out: int
+    error: Exception | None = None
+
+
+class Instrumentation:
+    # Hooks of the client requests, all of them do nothing by default.
+    # A request is every attempt of an endpoint call sent to the transport,
+    # the validation parses the response body (JSON decoding included)
+    def request_started(self, path: str, version: str, method: str, attempt: int):
+        pass
+
+    def request_finished(self, record: RequestRecord):
+        pass
+
+    def retry(self, path: str, version: str, attempt: int, delay: float):
+        pass
+
+    def validated(self, path: str, version: str, start: float, duration: float):
+        pass
+
+
+class Instrumentations(Instrumentation):
+    # Passes the hooks to many instrumentations
+    def __init__(self, *instrumentations: Instrumentation):
+        self.instrumentations = instrumentations
+
+    def request_started(self, path: str, version: str, method: str, attempt: int):
+        for instrumentation in self.instrumentations:
+            instrumentation.request_started(path, version, method, attempt)
+
+    def request_finished(self, record: RequestRecord):
+        for instrumentation in self.instrumentations:
+            instrumentation.request_finished(record)
+
+    def retry(self, path: str, version: str, attempt: int, delay: float):
+        for instrumentation in self.instrumentations:
+            instrumentation.retry(path, version, attempt, delay)
+
+    def validated(self, path: str, version: str, start: float, duration: float):
+        for instrumentation in self.instrumentations:
+            instrumentation.validated(path, version, start, duration)
+
+
+def _size(body: bytes | str | None) -> int:
+    if body is None:
+        return 0
+    return len(body.encode() if isinstance(body, str) else body)
+
+
+def request_size(response) -> int:
+    # A body of the sent request, `requests` keeps it in `body`, `httpx` in `content`
+    request = getattr(response, "request", None)
+    if request is None:
+        return 0
+    body = getattr(request, "body", None)
+    if body is None and not hasattr(request, "body"):
+        body = getattr(request, "content", None)
+    return _size(body)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last one is `+Inf`
+        self.count = 0
+        self.sum = 0.0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(count={self.count}, sum={self.sum:.6f})"
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        # An upper bound of the bucket where the quantile falls
+        rank = q * self.count
+        total = 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            if total >= rank and count:
+                return bound
+        return 0.0
+
+
+# Labels of the metrics
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricsCollector(Instrumentation):
+    # Histograms and counters per endpoint path and version in memory
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.request_duration: dict[Labels, Histogram] = {}
+        self.validate_duration: dict[Labels, Histogram] = {}
+        self.requests: Counter[Labels] = Counter()
+        self.bytes_in: Counter[Labels] = Counter()
+        self.bytes_out: Counter[Labels] = Counter()
+        self.retries: Counter[Labels] = Counter()
+        self._lock = Lock()
+
+    def _observe(self, histograms: dict, labels: Labels, value: float):
+        histogram = histograms.get(labels)
+        if histogram is None:
+            histogram = histograms[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def request_finished(self, record: RequestRecord):
+        labels = (("path", record.path), ("version", record.version))
+        status = str(record.status) if record.status else "error"
+        with self._lock:
+            self._observe(self.request_duration, labels, record.duration)
+            self.requests[(*labels, ("status", status))] += 1
+            self.bytes_in[labels] += record.bytes_in
+            self.bytes_out[labels] += record.bytes_out
+
+    def retry(self, path: str, version: str, attempt: int, delay: float):
+        with self._lock:
+            self.retries[(("path", path), ("version", version))] += 1
+
+    def validated(self, path: str, version: str, start: float, duration: float):
+        with self._lock:
+            self._observe(
+                self.validate_duration, (("path", path), ("version", version)), duration
+            )
+
+    def clear(self):
+        with self._lock:
+            for metric in (
+                self.request_duration,
+                self.validate_duration,
+                self.requests,
+                self.bytes_in,
+                self.bytes_out,
+                self.retries,
+            ):
+                metric.clear()
+
+
+def _labels(labels: Labels, **extra: str) -> str:
+    items = (*labels, *extra.items())
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"')) for name, value in items
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def prometheus_text(collector: MetricsCollector, prefix: str = "uklon") -> str:
+    # The text exposition format of Prometheus
+    lines = []
+    with collector._lock:
+        for name, help_, histograms in (
+            (
+                "request_duration_seconds",
+                "Requests sent to the transport",
+                collector.request_duration,
+            ),
+            (
+                "validate_duration_seconds",
+                "Validation of response bodies",
+                collector.validate_duration,
+            ),
+        ):
+            lines += [
+                f"# HELP {prefix}_{name} {help_}",
+                f"# TYPE {prefix}_{name} histogram",
+            ]
+            for labels, histogram in histograms.items():
+                total = 0
+                for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                    total += count
+                    lines.append(
+                        f"{prefix}_{name}_bucket{_labels(labels, le=str(bound))} {total}"
+                    )
+                lines += [
+                    f"{prefix}_{name}_sum{_labels(labels)} {histogram.sum}",
+                    f"{prefix}_{name}_count{_labels(labels)} {histogram.count}",
+                ]
+        for name, help_, counter in (
+            ("requests_total", "Responses by status", collector.requests),
+            ("response_bytes_total", "Received body bytes", collector.bytes_in),
+            ("request_bytes_total", "Sent body bytes", collector.bytes_out),
+            ("retries_total", "Retried requests", collector.retries),
+        ):
+            lines += [
+                f"# HELP {prefix}_{name} {help_}",
+                f"# TYPE {prefix}_{name} counter",
+            ]
+            lines += [
+                f"{prefix}_{name}{_labels(labels)} {value}"
+                for labels, value in counter.items()
+            ]
+    return "\n".join(lines) + "\n"
+
+
+@dataclass(slots=True)
+class Span:
+    # Similar to OpenTelemetry spans, times are seconds since the epoch
+    name: str
+    start: float
+    end: float
+    attributes: dict = field(default_factory=dict)
+    error: Exception | None = None
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: Sequence[Span]): ...
+
+
+class SpanRecorder(Instrumentation):
+    # Turns requests and validations into spans for an exporter
+    def __init__(self, exporter: SpanExporter):
+        self.exporter = exporter
+
+    def request_finished(self, record: RequestRecord):
+        span = Span(
+            name=f"{record.method.upper()} {record.path}",
+            start=record.start,
+            end=record.start + record.duration,
+            attributes={
+                "http.method": record.method.upper(),
+                "http.status_code": record.status,
+                "uklon.path": record.path,
+                "uklon.version": record.version,
+                "uklon.attempt": record.attempt,
+                "http.request.body.size": record.bytes_out,
+                "http.response.body.size": record.bytes_in,
+            },
+            error=record.error,
+        )
+        self.exporter.export((span,))
+
+    def validated(self, path: str, version: str, start: float, duration: float):
+        span = Span(
+            name=f"validate {path}",
+            start=start,
+            end=start + duration,
+            attributes={"uklon.path": path, "uklon.version": version},
+        )
+        self.exporter.export((span,))
+
+
+class InMemorySpanExporter:
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: Sequence[Span]):
+        self.spans.extend(spans)
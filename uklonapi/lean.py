@@ -0,0 +1,72 @@
+from functools import cache
+from types import UnionType
+from typing import Any, Iterable, Mapping, Union, get_args, get_origin
+
+from pydantic import BaseModel, Field, RootModel, TypeAdapter, create_model
+
+from .types import Unset
+
+# Models mapped to the only fields to parse, the rest of the payload is skipped
+LeanFields = frozenset[tuple[type[BaseModel], frozenset[str]]]
+
+
+def lean_fields(fields: Mapping[type[BaseModel], Iterable[str]]) -> LeanFields:
+    return frozenset((model, frozenset(names)) for model, names in fields.items())
+
+
+@cache
+def lean_type(type_: Any, fields: LeanFields) -> Any:
+    # The type with the selected models replaced by their lean versions
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        return _lean_model(type_, fields)
+    args = get_args(type_)
+    if not args:
+        return type_
+    lean_args = tuple(lean_type(arg, fields) for arg in args)
+    if lean_args == args:
+        return type_
+    origin = get_origin(type_)
+    if origin in (Union, UnionType):
+        return Union[lean_args]
+    return origin[lean_args]
+
+
+def _skipped(name: str) -> tuple[Any, Any]:
+    # The alias never matches, so the key of the payload is ignored as an extra one
+    return Any, Field(default=Unset, validation_alias=f"\0{name}")
+
+
+def _lean_model(model: type[BaseModel], fields: LeanFields) -> type[BaseModel]:
+    # A subclass of the model, so its methods and `isinstance` are kept
+    if issubclass(model, RootModel):
+        root = model.model_fields["root"].annotation
+        lean_root = lean_type(root, fields)
+        if lean_root is root:
+            return model
+        return create_model(
+            model.__name__,
+            __base__=model,
+            __module__=model.__module__,
+            root=(lean_root, ...),
+        )
+
+    selected = dict(fields).get(model)
+    model_fields = {}
+    for name, field in model.model_fields.items():
+        if selected is not None and name not in selected:
+            # Not parsed, `Unset` as missing optional fields
+            model_fields[name] = _skipped(name)
+            continue
+        annotation = lean_type(field.annotation, fields)
+        if annotation is not field.annotation:
+            model_fields[name] = annotation, field
+    if not model_fields:
+        return model
+    return create_model(
+        model.__name__, __base__=model, __module__=model.__module__, **model_fields
+    )
+
+
+@cache
+def lean_type_adapter(type_: Any, fields: LeanFields) -> TypeAdapter:
+    return TypeAdapter(lean_type(type_, fields))
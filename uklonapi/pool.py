@@ -0,0 +1,90 @@
+from pathlib import Path
+from threading import Lock
+from typing import Iterator
+
+from .api import UklonAPI
+from .auth_store import AuthStore, FileAuthStore
+from .retry import RetryBudget
+from .transport import TransportConfig
+
+
+class UklonClientPool:
+    # Clients of many accounts sharing one connection pool,
+    # every client keeps its own `auth`, `city_id` and `app_uid`
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        *,
+        api_class: type[UklonAPI] = UklonAPI,
+        transport_config: TransportConfig = TransportConfig(pool_maxsize=100),
+        auth_dir: str = ".",
+        auth_store: AuthStore = None,
+        **options,
+    ):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.api_class = api_class
+        self.auth_dir = Path(auth_dir)
+        # Every account has its own auth file in `auth_dir` by default,
+        # shared with other processes using the same directory
+        self.auth_store = auth_store or FileAuthStore(auth_dir)
+        # Passed to every client, `cache` for example. Cached and stored results
+        # are keyed by the account, so accounts may share an `app_uid`
+        self.options = options
+        # Retries are limited by one budget for all the accounts
+        self.options.setdefault("retry_budget", RetryBudget())
+
+        self._transport = api_class._create_transport(transport_config)
+        self._clients: dict[str, UklonAPI] = {}
+        self._lock = Lock()
+
+    def __contains__(self, account: str):
+        return account in self._clients
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._clients)
+
+    def __len__(self):
+        return len(self._clients)
+
+    def add_account(self, account: str, app_uid: str, city_id: int = None, **options):
+        # Options override the pool ones, `rate_limiter` of the account for example
+        with self._lock:
+            client = self._clients[account] = self.api_class(
+                app_uid,
+                self.client_id,
+                self.client_secret,
+                city_id,
+                transport=self._transport,
+                auth_store=self.auth_store,
+                auth_key=account,
+                **{**self.options, **options},
+            )
+        return client
+
+    def remove_account(self, account: str):
+        with self._lock:
+            del self._clients[account]
+
+    def for_account(self, account: str):
+        return self._clients[account]
+
+    def auth_save(self, *accounts: str) -> dict[str, bool]:
+        # Auths are saved to the store (all accounts by default)
+        return {
+            account: self._clients[account].auth_save()
+            for account in accounts or tuple(self._clients)
+        }
+
+    def auth_load(self, *accounts: str) -> dict[str, bool]:
+        return {
+            account: self._clients[account].auth_load()
+            for account in accounts or tuple(self._clients)
+        }
+
+    def close(self):
+        self._transport.close()
+
+    async def aclose(self):
+        await self._transport.aclose()
@@ -0,0 +1,77 @@
+import time
+from collections import Counter
+from threading import Lock
+from typing import Mapping
+
+
+class TokenBucket:
+    # Every caller reserves the next free slot, so the callers are queued
+    # in the order they came instead of failing or racing for tokens
+    def __init__(self, rate: float, burst: float = 1):
+        self.rate = rate  # tokens per second
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        # Takes a token and returns seconds to wait until it's available
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+
+class RateLimiter:
+    # Limits requests of one account overall (`rate`, `burst`)
+    # and per endpoint path: `endpoints={"fare-estimate": (rate, burst)}`
+    def __init__(
+        self,
+        rate: float = None,
+        burst: float = 1,
+        *,
+        endpoints: Mapping[str, tuple[float, float]] = None,
+    ):
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._endpoint_buckets = {
+            path: TokenBucket(*limit) for path, limit in (endpoints or {}).items()
+        }
+        # Wait metrics per endpoint path
+        self.waits: Counter[str] = Counter()
+        self.wait_time: Counter[str] = Counter()
+        self._lock = Lock()
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(waits={dict(self.waits)}, "
+            f"wait_time={dict(self.wait_time)})"
+        )
+
+    def _reserve(self, path: str) -> float:
+        delay = max(
+            (
+                bucket.reserve()
+                for bucket in (self._bucket, self._endpoint_buckets.get(path))
+                if bucket
+            ),
+            default=0.0,
+        )
+        if delay:
+            with self._lock:
+                self.waits[path] += 1
+                self.wait_time[path] += delay
+        return delay
+
+    def acquire(self, path: str):
+        if delay := self._reserve(path):
+            time.sleep(delay)
+
+    async def acquire_async(self, path: str):
+        import asyncio
+
+        if delay := self._reserve(path):
+            await asyncio.sleep(delay)
@@ -0,0 +1,103 @@
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from threading import Lock
+
+import requests
+
+# Errors worth retrying, HTTP errors are retried depending on their status code
+_REQUESTS_ERRORS = (requests.HTTPError, requests.ConnectionError, requests.Timeout)
+
+
+def retryable_errors() -> tuple[type[Exception], ...]:
+    # httpx errors can be raised only if httpx is imported (by an httpx transport),
+    # so it isn't imported just to classify them
+    httpx = sys.modules.get("httpx")
+    if httpx is None:
+        return _REQUESTS_ERRORS
+    return (*_REQUESTS_ERRORS, httpx.HTTPStatusError, httpx.TransportError)
+
+
+def _status_errors() -> tuple[type[Exception], ...]:
+    httpx = sys.modules.get("httpx")
+    if httpx is None:
+        return (requests.HTTPError,)
+    return requests.HTTPError, httpx.HTTPStatusError
+
+
+def _retry_after(response) -> float | None:
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    backoff: float = 0.5  # exponential: 0.5, 1, 2... seconds with full jitter
+    max_backoff: float = 10
+    statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    respect_retry_after: bool = True
+
+    def retryable(self, error: Exception) -> bool:
+        if isinstance(error, _status_errors()):
+            response = error.response
+            return response is not None and response.status_code in self.statuses
+        return isinstance(error, retryable_errors())
+
+    def delay(self, error: Exception, attempt: int) -> float:
+        # Seconds to wait before the next attempt (counted from 0)
+        response = getattr(error, "response", None)
+        if self.respect_retry_after and (retry_after := _retry_after(response)):
+            return min(max(retry_after, 0), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+class RetryBudget:
+    # Every request deposits `ratio` of a token and every retry withdraws one,
+    # so retries can't amplify an outage beyond `ratio` of the traffic
+    def __init__(self, ratio: float = 0.2, capacity: float = 10):
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RetryStats:
+    # Counters per endpoint path
+    def __init__(self):
+        self.retries: Counter[str] = Counter()
+        self.exhausted: Counter[str] = Counter()
+        self.budget_exhausted: Counter[str] = Counter()
+        self._lock = Lock()
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(retries={dict(self.retries)}, "
+            f"exhausted={dict(self.exhausted)}, "
+            f"budget_exhausted={dict(self.budget_exhausted)})"
+        )
+
+    def record(self, counter: Counter[str], path: str):
+        with self._lock:
+            counter[path] += 1
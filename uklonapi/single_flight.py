@@ -0,0 +1,55 @@
+from concurrent.futures import Future
+from threading import Lock
+from typing import TYPE_CHECKING, Awaitable, Callable, Hashable, TypeVar
+
+if TYPE_CHECKING:
+    import asyncio
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    # Concurrent calls with the same key share the result of the first one
+    def __init__(self):
+        self.coalesced = 0
+        self._futures: dict[Hashable, Future] = {}
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self._lock = Lock()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(coalesced={self.coalesced})"
+
+    def do(self, key: Hashable, f: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self._futures[key] = Future()
+        if future is not None:
+            return future.result()
+
+        future = self._futures[key]
+        try:
+            result = f()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+    async def do_async(self, key: Hashable, f: Callable[[], Awaitable[T]]) -> T:
+        import asyncio
+
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = self._tasks[key] = asyncio.ensure_future(f())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # A cancelled caller doesn't cancel the request shared with the others
+        return await asyncio.shield(task)
@@ -0,0 +1,148 @@
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Iterator, NamedTuple
+
+from .api import UklonAPI
+from .types.orders_history import Order, OrdersHistoryStats
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_created_at ON orders (created_at);
+CREATE INDEX IF NOT EXISTS orders_status ON orders (status);
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+class SyncResult(NamedTuple):
+    pages: int
+    inserted: int
+    updated: int
+
+
+class OrdersHistorySync:
+    # Keeps the order history in a local SQLite database.
+    # A run fetches pages (newest orders first) only until it reaches the orders
+    # known from the previous run minus `overlap` to pick up their status changes.
+    # Every page is committed with a checkpoint, so an interrupted run is resumed
+    def __init__(
+        self,
+        api: UklonAPI,
+        filename: str = "orders_history.sqlite3",
+        *,
+        page_size: int = 50,
+        prefetch: int = 1,
+        overlap: timedelta = timedelta(days=1),
+    ):
+        self.api = api
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.overlap = overlap
+        self._connection = sqlite3.connect(filename)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def _get_state(self, key: str) -> str | None:
+        row = self._connection.execute(
+            "SELECT value FROM state WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, **values: str | int | None):
+        for key, value in values.items():
+            if value is None:
+                self._connection.execute("DELETE FROM state WHERE key = ?", (key,))
+            else:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO state VALUES (?, ?)", (key, str(value))
+                )
+
+    def _upsert(self, orders: list[Order]) -> tuple[int, int]:
+        known = dict(
+            self._connection.execute(
+                "SELECT id, data FROM orders WHERE id IN "
+                f"({', '.join('?' * len(orders))})",
+                [order.id for order in orders],
+            ).fetchall()
+        )
+        inserted = updated = 0
+        for order in orders:
+            data = order.model_dump_json(exclude_unset=True)
+            if order.id not in known:
+                inserted += 1
+            elif known[order.id] != data:
+                updated += 1
+            else:
+                continue
+            self._connection.execute(
+                "INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?)",
+                (order.id, order.created_at.isoformat(), order.status, data),
+            )
+        return inserted, updated
+
+    def run(self) -> SyncResult:
+        synced_until = self._get_state("synced_until")
+        stop_at = (
+            datetime.fromisoformat(synced_until) - self.overlap
+            if synced_until
+            else None
+        )
+        # An interrupted run continues from its last committed page
+        page = int(self._get_state("page") or 0) + 1
+        newest = self._get_state("newest")
+
+        pages = inserted = updated = 0
+        for page_number, orders_history in self.api._iter_orders_history_pages(
+            page, self.page_size, self.prefetch
+        ):
+            orders = orders_history.items
+            with self._connection:
+                if orders:
+                    page_inserted, page_updated = self._upsert(orders)
+                    inserted += page_inserted
+                    updated += page_updated
+                    newest = max(
+                        filter(None, (newest, orders[0].created_at.isoformat()))
+                    )
+                self._set_state(page=page_number, newest=newest)
+            pages += 1
+            if stop_at and orders and orders[-1].created_at <= stop_at:
+                break
+
+        with self._connection:
+            self._set_state(synced_until=newest, page=None, newest=None)
+        return SyncResult(pages, inserted, updated)
+
+    def orders(self, since: datetime = None) -> Iterator[Order]:
+        # Stored orders, the newest first
+        query = "SELECT data FROM orders"
+        params = ()
+        if since:
+            query += " WHERE created_at >= ?"
+            params = (since.isoformat(),)
+        for (data,) in self._connection.execute(
+            query + " ORDER BY created_at DESC", params
+        ):
+            yield Order.model_validate_json(data)
+
+    def stats(self) -> OrdersHistoryStats:
+        # Counted from the local database, without calling the API
+        total, completed, canceled = self._connection.execute(
+            "SELECT COUNT(*), "
+            "COALESCE(SUM(status = 'completed'), 0), "
+            "COALESCE(SUM(status = 'canceled'), 0) "
+            "FROM orders"
+        ).fetchone()
+        return OrdersHistoryStats(
+            items=[],
+            has_more_items=False,
+            total=total,
+            completed=completed,
+            canceled=canceled,
+        )
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Protocol
+
+import requests
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    import httpx
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    connect_timeout: float | None = 5
+    read_timeout: float | None = 30
+    # `HTTPXTransport`/`AsyncHTTPXTransport` only: sending a request and waiting
+    # for a connection of a full pool, `requests` doesn't wait for the pool
+    write_timeout: float | None = 30
+    pool_timeout: float | None = 30
+    pool_maxsize: int = 10  # connections kept per host
+    keep_alive: bool = True
+    http2: bool = False  # `HTTPXTransport`/`AsyncHTTPXTransport` only
+
+
+class Transport(Protocol):
+    def get(self, url: str, *, headers: dict, params=None): ...
+
+    def post(self, url: str, *, headers: dict, data=None, json=None): ...
+
+    def with_content(self, response, content: bytes):
+        # A successful response with the given body (reused from a store)
+        ...
+
+    def close(self): ...
+
+
+class RequestsTransport:
+    def __init__(self, config: TransportConfig = TransportConfig()):
+        if config.http2:
+            raise ValueError("HTTP/2 is not supported by requests, use HTTPXTransport")
+        self.config = config
+        self._timeout = (config.connect_timeout, config.read_timeout)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.pool_maxsize)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        if not config.keep_alive:
+            self._session.headers["Connection"] = "close"
+
+    def get(self, url: str, *, headers: dict, params=None) -> requests.Response:
+        return self._session.get(
+            url, headers=headers, params=params, timeout=self._timeout
+        )
+
+    def post(
+        self, url: str, *, headers: dict, data=None, json=None
+    ) -> requests.Response:
+        return self._session.post(
+            url, headers=headers, data=data, json=json, timeout=self._timeout
+        )
+
+    def with_content(
+        self, response: requests.Response, content: bytes
+    ) -> requests.Response:
+        response.status_code = 200
+        response._content = content
+        return response
+
+    def close(self):
+        self._session.close()
+
+
+def http_errors() -> tuple[type[Exception], ...]:
+    # Errors of the transports, `requests` ones are `IOError`.
+    # httpx errors can be raised only if httpx is imported (by an httpx transport)
+    httpx = sys.modules.get("httpx")
+    return (IOError,) if httpx is None else (IOError, httpx.HTTPError)
+
+
+# httpx is imported by its transports only
+def _httpx_client_kwargs(config: TransportConfig) -> dict:
+    import httpx
+
+    return {
+        "timeout": httpx.Timeout(
+            connect=config.connect_timeout,
+            read=config.read_timeout,
+            write=config.write_timeout,
+            pool=config.pool_timeout,
+        ),
+        "limits": httpx.Limits(
+            max_connections=config.pool_maxsize,
+            max_keepalive_connections=config.pool_maxsize if config.keep_alive else 0,
+        ),
+        "http2": config.http2,  # requires the `h2` package
+    }
+
+
+def _httpx_with_content(response: httpx.Response, content: bytes) -> httpx.Response:
+    import httpx
+
+    return httpx.Response(
+        200, headers=response.headers, content=content, request=response.request
+    )
+
+
+class HTTPXTransport:
+    def __init__(self, config: TransportConfig = TransportConfig()):
+        import httpx
+
+        self.config = config
+        self._client = httpx.Client(**_httpx_client_kwargs(config))
+
+    def get(self, url: str, *, headers: dict, params=None) -> httpx.Response:
+        return self._client.get(url, headers=headers, params=params)
+
+    def post(self, url: str, *, headers: dict, data=None, json=None) -> httpx.Response:
+        return self._client.post(url, headers=headers, data=data, json=json)
+
+    def with_content(self, response: httpx.Response, content: bytes):
+        return _httpx_with_content(response, content)
+
+    def close(self):
+        self._client.close()
+
+
+class AsyncHTTPXTransport:
+    def __init__(self, config: TransportConfig = TransportConfig()):
+        import httpx
+
+        self.config = config
+        self._client = httpx.AsyncClient(**_httpx_client_kwargs(config))
+
+    async def get(self, url: str, *, headers: dict, params=None) -> httpx.Response:
+        return await self._client.get(url, headers=headers, params=params)
+
+    async def post(
+        self, url: str, *, headers: dict, data=None, json=None
+    ) -> httpx.Response:
+        return await self._client.post(url, headers=headers, data=data, json=json)
+
+    def with_content(self, response: httpx.Response, content: bytes):
+        return _httpx_with_content(response, content)
+
+    async def aclose(self):
+        await self._client.aclose()
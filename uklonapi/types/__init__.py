@@ -1,6 +1,35 @@
+from importlib import import_module
+
+import pydantic
+from pydantic import ConfigDict
+
+
 class _Unset:
     def __repr__(self):
         return "Unset"
 
+    # Stays the singleton in copied models
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
 
 Unset = _Unset()
+
+
+class BaseModel(pydantic.BaseModel):
+    # Schemas are built on the first validation instead of the import
+    model_config = ConfigDict(defer_build=True)
+
+
+def __getattr__(name: str):
+    # Model modules are imported on the first access, `types.orders` for example
+    if not name.startswith("_"):
+        try:
+            return import_module(f".{name}", __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
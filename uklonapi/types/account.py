@@ -1,7 +1,7 @@
+import time
 from functools import cached_property
 
-import jwt
-from pydantic import BaseModel
+from . import BaseModel
 
 
 class Auth(BaseModel):
@@ -12,7 +12,23 @@ class Auth(BaseModel):
     expires_in: int
     expires: str
     issued: str
+    # Parsed from the token once and saved with the auth
+    access_token_exp: int = None
+
+    def model_post_init(self, context):
+        if self.access_token_exp is None:
+            import jwt  # only needed here, deferred to speed up the import
+
+            self.access_token_exp = jwt.decode(
+                self.access_token, options={"verify_signature": False}
+            )["exp"]
+        self.expires_monotonic  # taken at load
 
     @cached_property
-    def access_token_exp(self):
-        return jwt.decode(self.access_token, options={"verify_signature": False})["exp"]
+    def expires_monotonic(self) -> float:
+        # The expiry by the monotonic clock, wall clock changes don't affect it
+        return time.monotonic() + (self.access_token_exp - time.time())
+
+    def expires_after(self) -> float:
+        # Seconds left until the access token expires
+        return self.expires_monotonic - time.monotonic()
@@ -2,7 +2,10 @@ from enum import StrEnum, auto
 from functools import cached_property
 from typing import Iterator
 
-from pydantic import BaseModel, RootModel
+from pydantic import ConfigDict, RootModel
+
+from ..geo import Coordinates, SpatialIndex
+from . import BaseModel
 
 
 class Point(BaseModel):
@@ -45,6 +48,8 @@ class AddressType(StrEnum):
 
 
 class FavoriteAddresses(RootModel[list[Address]]):
+    model_config = ConfigDict(defer_build=True)
+
     def __getitem__(self, item) -> Address:
         return self.root[item]
 
@@ -54,18 +59,44 @@ class FavoriteAddresses(RootModel[list[Address]]):
     def __repr__(self):
         return f"{self.__repr_name__()}(home={self.home!r}, work={self.work!r}, other={self.other!r})"
 
+    @cached_property
+    def by_id(self) -> dict[str, Address]:
+        return {address.id: address for address in self.root}
+
+    @cached_property
+    def by_type(self) -> dict[str, list[Address]]:
+        by_type = {}
+        for address in self.root:
+            by_type.setdefault(address.type, []).append(address)
+        return by_type
+
+    @cached_property
+    def spatial_index(self) -> SpatialIndex[Address]:
+        return SpatialIndex(self.root, lambda address: address.address_point.point)
+
+    def get(self, id_: str) -> Address | None:
+        return self.by_id.get(id_)
+
+    def nearest(self, point: Coordinates, max_distance: float = None) -> Address | None:
+        nearest = self.spatial_index.nearest(point, max_distance)
+        return nearest[0] if nearest else None
+
+    def within(self, point: Coordinates, radius: float) -> list[Address]:
+        return [address for address, _ in self.spatial_index.within(point, radius)]
+
     @cached_property
     def home(self) -> Address | None:
-        return next(
-            (address for address in self.root if address.type == AddressType.HOME), None
-        )
+        return next(iter(self.by_type.get(AddressType.HOME, ())), None)
 
     @cached_property
     def work(self) -> Address | None:
-        return next(
-            (address for address in self.root if address.type == AddressType.WORK), None
-        )
+        return next(iter(self.by_type.get(AddressType.WORK, ())), None)
 
     @cached_property
     def other(self) -> list[Address]:
-        return [address for address in self.root if address.type not in AddressType]
+        return [
+            address
+            for type_, addresses in self.by_type.items()
+            if type_ not in tuple(AddressType)
+            for address in addresses
+        ]
@@ -1,6 +1,10 @@
+from functools import cached_property
 from typing import Iterator
 
-from pydantic import BaseModel, RootModel
+from pydantic import ConfigDict, RootModel
+
+from ..geo import Coordinates, SpatialIndex
+from . import BaseModel
 
 
 class Currency(BaseModel):
@@ -26,11 +30,32 @@ class City(BaseModel):
 
 
 class Cities(RootModel[list[City]]):
+    model_config = ConfigDict(defer_build=True)
+
     def __iter__(self) -> Iterator[City]:
         return iter(self.root)
 
     def __repr__(self):
         return f"{self.__repr_name__()}({self.root!r})"
 
+    @cached_property
+    def by_id(self) -> dict[int, City]:
+        return {city.id: city for city in self.root}
+
+    @cached_property
+    def by_code(self) -> dict[str, City]:
+        return {city.code: city for city in self.root}
+
+    @cached_property
+    def spatial_index(self) -> SpatialIndex[City]:
+        return SpatialIndex(self.root, lambda city: city.location)
+
     def get(self, id_: int) -> City | None:
-        return next((city for city in self.root if city.id == id_), None)
+        return self.by_id.get(id_)
+
+    def nearest(self, location: Coordinates, max_distance: float = None) -> City | None:
+        nearest = self.spatial_index.nearest(location, max_distance)
+        return nearest[0] if nearest else None
+
+    def within(self, location: Coordinates, radius: float) -> list[City]:
+        return [city for city, _ in self.spatial_index.within(location, radius)]
@@ -1,7 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
-
+from . import BaseModel
 from .fare_estimate import RideCondition
 
 
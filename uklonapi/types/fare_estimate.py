@@ -3,10 +3,8 @@ from enum import Enum, EnumMeta
 from functools import cached_property
 from uuid import UUID
 
-from pydantic import BaseModel
-
-from . import Unset
-from .address import Address
+from . import BaseModel, Unset
+from .address import Address, FavoriteAddresses
 
 
 class Point(BaseModel):
@@ -22,6 +20,19 @@ class Point(BaseModel):
             lng=address.address_point.point.lng,
         )
 
+    @classmethod
+    def from_coordinates(
+        cls,
+        lat: float,
+        lng: float,
+        addresses: FavoriteAddresses = None,
+        max_distance: float = 100,
+    ):
+        # Named after the nearest favorite address if there is one close enough
+        if addresses and (address := addresses.nearest((lat, lng), max_distance)):
+            return cls(name=address.address_point.name, lat=lat, lng=lng)
+        return cls(name=f"{lat}, {lng}", lat=lat, lng=lng)
+
 
 class _RideCondition(BaseModel):
     name: str
@@ -102,8 +113,13 @@ class FareEstimate(BaseModel):
     product_fares: list[Fare]
     route: Route = Unset
 
+    @cached_property
+    def fares(self) -> dict[str, Fare]:
+        return {pf.product_type: pf for pf in self.product_fares}
+
+    def fare(self, product_type: str) -> Fare | None:
+        return self.fares.get(product_type)
+
     @cached_property
     def standard(self) -> Fare | None:
-        return next(
-            (pf for pf in self.product_fares if pf.product_type == "Standard"), None
-        )
+        return self.fare("Standard")
@@ -1,6 +1,6 @@
 from datetime import date, datetime
 
-from pydantic import BaseModel
+from . import BaseModel
 
 
 class Wallet(BaseModel):
@@ -1,9 +1,7 @@
 from datetime import datetime, timedelta
 from typing import Literal
 
-from pydantic import BaseModel
-
-from . import Unset
+from . import BaseModel, Unset
 from .payment_methods import PaymentMethod
 
 
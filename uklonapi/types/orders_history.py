@@ -1,7 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
-
+from . import BaseModel
 from .payment_methods import PaymentMethod
 
 
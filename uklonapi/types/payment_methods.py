@@ -1,6 +1,4 @@
-from pydantic import BaseModel
-
-from . import Unset
+from . import BaseModel, Unset
 
 
 class PaymentMethod(BaseModel):
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterable, Iterator, Mapping
+
+from .api import UklonAPI
+from .types.orders import Order
+
+# Seconds between polls while a watched order has the status
+POLL_INTERVALS = {
+    "processing": 2,
+    "accepted": 2,
+    "running": 10,
+}
+WATCHED_FIELDS = ("status", "driver", "vehicle", "cost", "idle")
+
+
+@dataclass(frozen=True)
+class OrderEvent:
+    order: Order
+    changes: dict[str, tuple[Any, Any]] = field(default_factory=dict)  # old, new
+    final: bool = False  # the order has a terminal status and isn't watched anymore
+
+    @property
+    def order_id(self) -> str:
+        return self.order.id
+
+
+class OrderWatcher:
+    # Polls all the watched orders of an account with a single `orders()` call,
+    # as often as the most urgent status requires, and emits changes only
+    def __init__(
+        self,
+        api: UklonAPI,
+        order_ids: Iterable[str] = (),
+        *,
+        watch_new: bool = False,
+        intervals: Mapping[str, float] = None,
+        fields: Iterable[str] = WATCHED_FIELDS,
+    ):
+        self.api = api
+        self.watch_new = watch_new  # start watching any new active order
+        self.intervals = {**POLL_INTERVALS, **(intervals or {})}
+        self.fields = tuple(fields)
+        self._orders: dict[str, Order | None] = dict.fromkeys(order_ids)
+
+    def __len__(self):
+        return len(self._orders)
+
+    def watch(self, order_id: str):
+        self._orders.setdefault(order_id, None)
+
+    def unwatch(self, order_id: str):
+        self._orders.pop(order_id, None)
+
+    def interval(self) -> float:
+        # An order without a known status is polled as often as possible
+        return min(
+            (
+                self.intervals.get(order.status, 0) if order else 0
+                for order in self._orders.values()
+            ),
+            default=max(self.intervals.values()),
+        )
+
+    def _split(self, active_orders: list[Order]) -> tuple[list[Order], list[str]]:
+        active = {order.id: order for order in active_orders}
+        if self.watch_new:
+            for order_id in active:
+                self.watch(order_id)
+        found = [active[order_id] for order_id in self._orders if order_id in active]
+        missing = [order_id for order_id in self._orders if order_id not in active]
+        return found, missing
+
+    def _update(self, order: Order) -> OrderEvent | None:
+        previous = self._orders.get(order.id)
+        changes = {}
+        for name in self.fields:
+            value = getattr(order, name)
+            old_value = getattr(previous, name) if previous else None
+            if previous is None or old_value != value:
+                changes[name] = (old_value, value)
+
+        final = order.status not in self.intervals
+        if final:
+            self.unwatch(order.id)
+        else:
+            self._orders[order.id] = order
+        return OrderEvent(order, changes, final) if changes or final else None
+
+    def poll(self) -> list[OrderEvent]:
+        found, missing = self._split(self.api.orders())
+        # Orders which aren't active anymore are requested to get their final state
+        orders = [*found, *(self.api.orders(order_id) for order_id in missing)]
+        return [event for order in orders if (event := self._update(order))]
+
+    async def poll_async(self) -> list[OrderEvent]:
+        found, missing = self._split(await self.api.orders())
+        orders = [
+            *found,
+            *await asyncio.gather(*(self.api.orders(order_id) for order_id in missing)),
+        ]
+        return [event for order in orders if (event := self._update(order))]
+
+    def __iter__(self) -> Iterator[OrderEvent]:
+        while self._orders or self.watch_new:
+            yield from self.poll()
+            time.sleep(self.interval())
+
+    async def __aiter__(self) -> AsyncIterator[OrderEvent]:
+        while self._orders or self.watch_new:
+            for event in await self.poll_async():
+                yield event
+            await asyncio.sleep(self.interval())